@@ -0,0 +1,47 @@
+"""
+Benchmark contraction hierarchy queries against plain Dijkstra and A*, on the grid of 'recipes/shortest_path_in_grid.py'.
+
+Run as 'python -m anygraph.benchmarks.contraction_hierarchy [side ...]'; e.g. pass 200 for a 200x200 grid. Preprocessing
+grows faster than linear in pure python: about 1.5s for 50x50, 10s for 100x100 and a minute for 200x200; grids of a
+million nodes (1000x1000) are out of reach. Queries are 30 to 60 times faster than dijkstra on these grids.
+"""
+import random
+import sys
+
+from anygraph.recipes.shortest_path_in_grid import Node, create_nodes_dict, connect_nodes, manhattan_distance
+from anygraph.tools import stopwatch
+
+
+if __name__ == '__main__':
+    sides = [int(arg) for arg in sys.argv[1:]] or [50, 100]
+    rand = random.Random(0)
+    for side in sides:
+        nodes_dict = create_nodes_dict(side)
+        connect_nodes(nodes_dict)
+        start_node = nodes_dict[0, 0]
+
+        with stopwatch() as preprocess_time:
+            hierarchy = Node.adjacent.preprocess_hierarchy(start_node, get_cost=manhattan_distance)
+        print(f"{side:5}x{side:<5}: preprocessing {len(hierarchy)} nodes {preprocess_time():.2f}s, "
+              f"{len(hierarchy.middle)} shortcuts")
+
+        nodes = list(hierarchy.nodes)
+        queries = [(rand.choice(nodes), rand.choice(nodes)) for _ in range(100)]
+
+        with stopwatch() as hierarchy_time:
+            hierarchy_costs = [hierarchy.cost(start, target) for start, target in queries]
+        with stopwatch() as unpack_time:
+            for start, target in queries:
+                hierarchy.shortest_path(start, target)
+        with stopwatch() as dijkstra_time:
+            paths = [Node.adjacent.shortest_path(start, target, get_cost=manhattan_distance)
+                     for start, target in queries]
+        with stopwatch() as astar_time:
+            for start, target in queries:
+                Node.adjacent.shortest_path(start, target, get_cost=manhattan_distance, heuristic=manhattan_distance)
+
+        assert hierarchy_costs == [len(path) - 1 for path in paths]  # each edge costs 1 in the grid
+        count = len(queries)
+        print(f"{side:5}x{side:<5}: per query: hierarchy {1e6 * hierarchy_time() / count:.0f}us "
+              f"(with path {1e6 * unpack_time() / count:.0f}us), dijkstra {1e6 * dijkstra_time() / count:.0f}us, "
+              f"astar {1e6 * astar_time() / count:.0f}us")
@@ -0,0 +1,75 @@
+"""
+Benchmark read-only queries on a frozen snapshot against the same queries on the linked graph, using the grid of
+'recipes/shortest_path_in_grid.py', and the pure Python against the NumPy versions of the analytics on the snapshot.
+
+On a 300x300 grid the queries on the snapshot run about 2 to 3 times faster (iterate 0.25s vs 0.09s, dijkstra 0.67s vs
+0.23s) and use far less memory; the larger gains are in the NumPy versions of 'components' and 'pagerank'.
+"""
+import tracemalloc
+
+from anygraph.benchmarks.shortest_path_grid import random_weights
+from anygraph.recipes.shortest_path_in_grid import Node, create_nodes_dict, connect_nodes
+from anygraph.tools import stopwatch
+from anygraph.vectorized import numpy
+
+
+def snapshot_size(frozen):
+    """ bytes used by the edge arrays of the snapshot """
+    size = frozen.offsets.itemsize * len(frozen.offsets) + frozen.indices.itemsize * len(frozen.indices)
+    if frozen.weights is not None:
+        size += frozen.weights.itemsize * len(frozen.weights)
+    return size
+
+
+def peak_memory(func):
+    """ peak memory allocated while running func (measured separately, tracing slows everything down) """
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == '__main__':
+    for size in (100, 300):
+        nodes_dict = create_nodes_dict(size)
+        connect_nodes(nodes_dict)
+        start_node, end_node = nodes_dict[0, 0], nodes_dict[size - 1, size - 1]
+        get_cost = random_weights()
+
+        with stopwatch() as freeze_time:
+            frozen = Node.adjacent.freeze(start_node, get_cost=get_cost)
+            frozen.reverse()  # used by 'gather'
+        start, end = frozen.index_of(start_node), frozen.index_of(end_node)
+        print(f"{size:4}x{size:<4} freeze     : {freeze_time():.3f}s, {snapshot_size(frozen) / 2**20:.1f}MB of arrays")
+
+        for name, linked_func, frozen_func in [
+            ('iterate', lambda: sum(1 for _ in Node.adjacent.iterate(start_node, breadth_first=True)),
+                        lambda: sum(1 for _ in frozen.iterate(start, breadth_first=True))),
+            ('gather', lambda: len(Node.adjacent.gather(start_node)),
+                       lambda: len(frozen.gather(start))),
+            ('reachable', lambda: Node.adjacent.reachable(start_node, end_node),
+                          lambda: frozen.reachable(start, end)),
+            ('dijkstra', lambda: len(Node.adjacent.shortest_path(start_node, end_node, get_cost=get_cost)),
+                         lambda: len(frozen.shortest_path(start, end))),
+        ]:
+            with stopwatch() as linked_time:
+                linked_result = linked_func()
+            with stopwatch() as frozen_time:
+                frozen_result = frozen_func()
+            linked_memory, frozen_memory = peak_memory(linked_func), peak_memory(frozen_func)
+
+            assert linked_result == frozen_result
+            print(f"{size:4}x{size:<4} {name:11}: linked {linked_time():.3f}s ({linked_memory / 2**20:.1f}MB), "
+                  f"frozen {frozen_time():.3f}s ({frozen_memory / 2**20:.1f}MB)")
+
+        if numpy is None:
+            continue
+        for name, func in [('levels', lambda use_numpy: frozen.levels([start, end], use_numpy=use_numpy)),
+                           ('components', lambda use_numpy: frozen.components(use_numpy=use_numpy)),
+                           ('pagerank', lambda use_numpy: frozen.pagerank(max_iterations=20, use_numpy=use_numpy))]:
+            with stopwatch() as python_time:
+                func(False)
+            with stopwatch() as numpy_time:
+                func(True)
+            print(f"{size:4}x{size:<4} {name:11}: python {python_time():.3f}s, numpy {numpy_time():.3f}s")
@@ -0,0 +1,48 @@
+"""
+Benchmark saving and loading a long chain with a few shortcuts in a SQLite file ('save_graph', 'load_graph'), a full
+save against an incremental save after a few changes, and loading against linking the same edges one by one.
+"""
+import os
+import tempfile
+
+from anygraph import Many
+from anygraph.tools import stopwatch
+
+
+class Node(object):
+    nexts = Many('prevs')
+    prevs = Many('nexts')
+
+    def __init__(self, num):
+        self.num = num
+
+
+def create_chain(count):
+    nodes = [Node(i) for i in range(count)]
+    for i in range(count - 1):
+        nodes[i].nexts.include(nodes[i + 1])
+        if i % 10 == 0:
+            nodes[i].nexts.include(nodes[(i * 7) % count])
+    return nodes
+
+
+if __name__ == '__main__':
+    count = 10**5
+    nodes = create_chain(count)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'graph.db')
+        with stopwatch() as save_time:
+            Node.nexts.save_graph(nodes[0], path)
+        for i in range(10, count, count // 10):
+            nodes[i].num = -i
+            nodes[i].nexts.exclude(nodes[(i * 7) % count])
+        with stopwatch() as incremental_time:
+            written = Node.nexts.save_graph(nodes[0], path)
+        print(f"save {count} nodes: {save_time():.3f}s, incremental ({written[0]} nodes, {written[1]} links): "
+              f"{incremental_time():.3f}s")
+
+        with stopwatch() as load_time:
+            Node.nexts.load_graph(path)
+        with stopwatch() as link_time:
+            create_chain(count)
+        print(f"load {count} nodes: {load_time():.3f}s, linking one by one: {link_time():.3f}s")
@@ -0,0 +1,43 @@
+"""
+Benchmark linking a large number of targets to a single (hub) node, both one-by-one and in bulk.
+"""
+from anygraph import Many
+from anygraph.tools import stopwatch
+
+
+class Node(object):
+    """ double linked graph nodes, 'followers' of a node link back via 'following' """
+    followers = Many('following')
+    following = Many('followers')
+
+    def __init__(self, num):
+        self.num = num
+
+
+def link_one_by_one(hub, targets):
+    for target in targets:
+        hub.followers.include(target)
+
+
+def link_in_bulk(hub, targets):
+    hub.followers.include(*targets)
+
+
+if __name__ == '__main__':
+    for count in (10**5, 10**6):
+        for link in (link_one_by_one, link_in_bulk):
+            hub = Node(-1)
+            targets = [Node(i) for i in range(count)]
+
+            with stopwatch() as linking_time:
+                link(hub, targets)
+
+            with stopwatch() as relink_time:
+                link(hub, targets)  # all targets already linked: only membership checks
+
+            with stopwatch() as unlink_time:
+                hub.followers.exclude(*targets)
+
+            assert len(hub.followers) == 0
+            print(f"{link.__name__:16} {count:8} targets: link {linking_time():.3f}s, "
+                  f"relink {relink_time():.3f}s, unlink {unlink_time():.3f}s")
@@ -0,0 +1,60 @@
+"""
+Microbenchmark of looking up next nodes: the generic Iterator(name).iter_object (attrgetter, descriptor __get__ and
+type checks) against the function specific for the graph used by the linker methods (reading obj.__dict__ directly),
+for One, Many and ManyMap.
+"""
+from anygraph import One, Many, ManyMap, Iterator
+from anygraph.tools import stopwatch
+
+
+class OneNode(object):
+    next = One()
+
+
+class ManyNode(object):
+    nexts = Many()
+
+
+class MapNode(object):
+    nexts = ManyMap(key='name')
+
+    def __init__(self, name):
+        self.name = name
+
+
+def create_chains(count):
+    one_nodes = [OneNode() for _ in range(count)]
+    many_nodes = [ManyNode() for _ in range(count)]
+    map_nodes = [MapNode(str(i)) for i in range(count)]
+    for i in range(count - 1):
+        one_nodes[i].next = one_nodes[i + 1]
+        many_nodes[i].nexts.include(many_nodes[i + 1], many_nodes[(i * 7) % count])
+        map_nodes[i].nexts.include(map_nodes[i + 1], map_nodes[(i * 7) % count])
+    return [(OneNode.next, one_nodes), (ManyNode.nexts, many_nodes), (MapNode.nexts, map_nodes)]
+
+
+def expand_all(iter_object, nodes):
+    for node in nodes:
+        for _ in iter_object(node):
+            pass
+
+
+if __name__ == '__main__':
+    count = 10**5
+    for linker, nodes in create_chains(count):
+        for name, iter_object in [('generic', Iterator(linker.name).iter_object),
+                                  ('specific', linker._iter_object)]:
+            with stopwatch() as expand_time:
+                for _ in range(10):
+                    expand_all(iter_object, nodes)
+            print(f"{type(linker).__name__:8} {name:8}: {10 * count / expand_time() / 1e6:.2f}M nodes expanded/s")
+
+        with stopwatch() as iterate_time:
+            for _ in range(10):
+                for _ in Iterator(linker.name).iterate(nodes[0]):
+                    pass
+        with stopwatch() as linker_time:
+            for _ in range(10):
+                for _ in linker.iterate(nodes[0]):
+                    pass
+        print(f"{type(linker).__name__:8} iterate : generic {iterate_time():.3f}s, specific {linker_time():.3f}s")
@@ -0,0 +1,56 @@
+"""
+Benchmark the peak memory (and time) of breadth first iteration and Dijkstra on a large grid, with and without
+'number_nodes=True', which replaces the sets and dicts keyed by id() with bytearrays and lists indexed by node number.
+"""
+import tracemalloc
+
+from anygraph import Many
+from anygraph.tools import stopwatch
+
+
+class Plain(object):
+    adjacent = Many('adjacent')
+
+    def __init__(self, index):
+        self.index = index
+
+
+class Numbered(object):
+    adjacent = Many('adjacent', number_nodes=True)
+
+    def __init__(self, index):
+        self.index = index
+
+
+def create_grid(cls, size):
+    nodes = {(x, y): cls((x, y)) for x in range(size) for y in range(size)}
+    for (x, y), node in nodes.items():
+        node.adjacent.include(*(nodes[x + dx, y + dy] for dx, dy in ((1, 0), (0, 1)) if (x + dx, y + dy) in nodes))
+    return nodes
+
+
+def get_cost(node1, node2):
+    return 1 + (node1.index[0] * 7 + node2.index[1] * 13) % 10
+
+
+def measure(func):
+    """ time and peak memory allocated while running func (measured separately, tracing slows everything down) """
+    with stopwatch() as run_time:
+        func()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return run_time(), peak
+
+
+if __name__ == '__main__':
+    for size in (300, 600):
+        for cls in (Plain, Numbered):
+            nodes = create_grid(cls, size)
+            start, end = nodes[0, 0], nodes[size - 1, size - 1]
+            for name, func in [('iterate', lambda: sum(1 for _ in cls.adjacent.iterate(start, breadth_first=True))),
+                               ('gather', lambda: cls.adjacent.gather(start)),
+                               ('dijkstra', lambda: cls.adjacent.shortest_path(start, end, get_cost=get_cost))]:
+                run_time, peak = measure(func)
+                print(f"{size:4}x{size:<4} {cls.__name__:8} {name:8}: {run_time:.3f}s, peak {peak / 2**20:.1f}MB")
@@ -0,0 +1,78 @@
+"""
+Benchmark shortest path algorithms on (randomly) weighted grids, using the grid of 'recipes/shortest_path_in_grid.py'.
+"""
+import random
+from collections import deque
+
+from anygraph.recipes.shortest_path_in_grid import Node, create_nodes_dict, connect_nodes, manhattan_distance
+from anygraph.tools import stopwatch
+from anygraph.visitors import Iterator
+
+
+def random_weights(seed=0):
+    """ cost function with random (but fixed per edge) weights between 1 and 10 """
+    rand = random.Random(seed)
+    weights = {}
+
+    def get_cost(node1, node2):
+        key = (node1.index, node2.index) if node1.index < node2.index else (node2.index, node1.index)
+        if key not in weights:
+            weights[key] = rand.randint(1, 10)
+        return weights[key]
+
+    return get_cost
+
+
+def counting(get_cost):
+    """ wraps the cost function to count the number of edges followed """
+    def counting_get_cost(node1, node2):
+        counting_get_cost.count += 1
+        return get_cost(node1, node2)
+
+    counting_get_cost.count = 0
+    return counting_get_cost
+
+
+def fifo_shortest_path_cost(start_obj, target_obj, get_cost):
+    """ the previous (label correcting, FIFO queue) algorithm, as reference """
+    iter_object = Iterator('adjacent').iter_object
+    cost = {id(start_obj): 0}
+    queue = deque([start_obj])
+    while queue:
+        obj = queue.popleft()
+        for next_obj in iter_object(obj):
+            next_cost = cost[id(obj)] + get_cost(obj, next_obj)
+            if next_cost < cost.get(id(next_obj), float('inf')):
+                cost[id(next_obj)] = next_cost
+                queue.append(next_obj)
+    return cost.get(id(target_obj))
+
+
+if __name__ == '__main__':
+    for size in (50, 100, 200):
+        nodes_dict = create_nodes_dict(size)
+        connect_nodes(nodes_dict)
+        start_node, end_node = nodes_dict[0, 0], nodes_dict[size - 1, size - 1]
+        get_cost = random_weights()
+        get_cost(start_node, end_node)  # fill weights upfront, outside of timing
+
+        with stopwatch() as landmarks_time:
+            landmarks = Node.adjacent.build_landmarks(start_node, count=8, get_cost=get_cost)
+        print(f"{size:4}x{size:<4} {'landmarks':11}: {landmarks_time():.3f}s to build")
+
+        for name, heuristic, bidirectional in [('dijkstra', None, False),
+                                               ('astar', manhattan_distance, False),
+                                               ('alt', landmarks, False),
+                                               ('bi-dijkstra', None, True),
+                                               ('bi-astar', manhattan_distance, True)]:
+            cost_func = counting(get_cost)
+            with stopwatch() as path_time:
+                path = Node.adjacent.shortest_path(start_node, end_node, get_cost=cost_func, heuristic=heuristic,
+                                                   bidirectional=bidirectional)
+            print(f"{size:4}x{size:<4} {name:11}: {path_time():.3f}s, {cost_func.count:8} edges followed, "
+                  f"path cost {sum(get_cost(n1, n2) for n1, n2 in zip(path[:-1], path[1:]))}")
+
+        cost_func = counting(get_cost)
+        with stopwatch() as fifo_time:
+            cost = fifo_shortest_path_cost(start_node, end_node, get_cost=cost_func)
+        print(f"{size:4}x{size:<4} {'fifo':11}: {fifo_time():.3f}s, {cost_func.count:8} edges followed, path cost {cost}")
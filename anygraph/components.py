@@ -0,0 +1,168 @@
+from itertools import count
+from weakref import ref
+
+
+class _NodeRef(ref):
+    """ weak reference to a tracked node, that remembers the id of the node """
+    __slots__ = ('obj_id',)
+
+    def __init__(self, obj, callback):
+        super().__init__(obj, callback)
+        self.obj_id = id(obj)
+
+
+class ComponentTracker(object):
+    """
+    Keeps track of the connected components of a graph (following links in both directions) while it changes, with a
+    union-find structure. Linking merges two components, in nearly constant time. Unlinking only marks the component
+    as changed: it is split again (with a search through that component only) on the first query that needs it.
+
+    The tracker only keeps weak references to the nodes, so it does not keep dropped nodes alive; nodes that are
+    garbage collected are removed from their component (splitting it) on the next call to the tracker.
+
+    Each component has a version, which changes on every link or unlink in it, so results computed for a component can
+    be cached until that component (instead of any graph with the same name) changes.
+    """
+
+    def __init__(self, iter_neighbours):
+        """
+        :param iter_neighbours: function returning the nodes linked to a node, in either direction
+        """
+        self.iter_neighbours = iter_neighbours
+        self.parent = {}  # id(node) -> id of parent in union-find tree
+        self.members = {}  # id of root -> list of ids of nodes in component
+        self.refs = {}  # id(node) -> weak reference to node
+        self.dead = []  # weak references to nodes that were garbage collected while tracked
+        self.dirty = set()  # ids of roots of components that might have been split
+        self.versions = {}  # id of root -> version of component
+        self._next_version = count(1).__next__
+        self._on_collect = self.dead.append  # weak reference callback: collects the references to collected nodes
+
+    def __len__(self):
+        """ number of nodes tracked """
+        if self.dead:
+            self._purge()
+        return len(self.parent)
+
+    def _purge(self):
+        """ removes garbage collected nodes, before their ids can be reused by new nodes """
+        while self.dead:
+            obj_id = self.dead.pop().obj_id
+            if self.refs.get(obj_id) is not None and self.refs[obj_id]() is None:
+                self._split(self._find(obj_id))
+
+    def _find(self, obj_id):
+        parent = self.parent
+        root = obj_id
+        while parent[root] != root:
+            root = parent[root]
+        while parent[obj_id] != root:  # path compression
+            parent[obj_id], obj_id = root, parent[obj_id]
+        return root
+
+    def _root(self, obj):
+        """ root of the component of obj (after splitting it if needed), None if obj is not tracked """
+        if self.dead:
+            self._purge()
+        if id(obj) not in self.parent:
+            return None
+        root = self._find(id(obj))
+        if root in self.dirty:
+            self._split(root)
+            if id(obj) not in self.parent:
+                return None  # no longer linked
+            root = self._find(id(obj))
+        return root
+
+    def _track(self, obj):
+        obj_id = id(obj)
+        self.refs[obj_id] = _NodeRef(obj, self._on_collect)
+        return obj_id
+
+    def _add(self, obj):
+        obj_id = id(obj)
+        if obj_id not in self.parent:
+            self._track(obj)
+            self.parent[obj_id] = obj_id
+            self.members[obj_id] = [obj_id]
+            self.versions[obj_id] = self._next_version()
+        return obj_id
+
+    def link(self, obj, target):
+        """ merge the components of obj and target """
+        if self.dead:
+            self._purge()
+        root, target_root = self._find(self._add(obj)), self._find(self._add(target))
+        if root == target_root:
+            self.versions[root] = self._next_version()
+            return
+        if len(self.members[root]) < len(self.members[target_root]):
+            root, target_root = target_root, root
+        self.parent[target_root] = root
+        self.members[root].extend(self.members.pop(target_root))
+        del self.versions[target_root]
+        self.versions[root] = self._next_version()
+        if target_root in self.dirty:
+            self.dirty.discard(target_root)
+            self.dirty.add(root)
+
+    def unlink(self, obj, target=None):
+        """ mark the component of obj (and target) as possibly split """
+        if self.dead:
+            self._purge()
+        if id(obj) in self.parent:
+            root = self._find(id(obj))
+            self.dirty.add(root)
+            self.versions[root] = self._next_version()
+
+    def _split(self, root):
+        """ recompute the components within the (former) component with this root """
+        self.dirty.discard(root)
+        member_ids = self.members.pop(root)
+        del self.versions[root]
+        members = [self.refs.pop(member_id)() for member_id in member_ids]
+        for member_id in member_ids:
+            del self.parent[member_id]
+        for member in members:
+            if member is None or id(member) in self.parent:
+                continue  # garbage collected, or already in a new component
+            new_root = self._add(member)
+            component, nodes = self.members[new_root], [member]
+            index = 0
+            while index < len(nodes):
+                for neighbour in self.iter_neighbours(nodes[index]):
+                    if id(neighbour) not in self.parent:
+                        self.parent[self._track(neighbour)] = new_root
+                        component.append(id(neighbour))
+                        nodes.append(neighbour)
+                index += 1
+            if len(component) == 1 and not any(True for _ in self.iter_neighbours(member)):
+                del self.parent[new_root], self.members[new_root], self.versions[new_root]  # unlinked: stop tracking
+                del self.refs[new_root]
+
+    def version(self, obj):
+        """ return the version of the component of obj, None if obj is not linked """
+        root = self._root(obj)
+        return None if root is None else self.versions[root]
+
+    def same_component(self, obj, other):
+        """ return whether obj and other are connected through the graph (in any direction) """
+        if obj is other:
+            return True
+        root = self._root(obj)
+        return root is not None and root == self._root(other)
+
+    def component(self, obj):
+        """ return the list of nodes connected to obj (including obj) """
+        root = self._root(obj)
+        if root is None:
+            return [obj]
+        refs = self.refs
+        return [refs[member_id]() for member_id in self.members[root]]
+
+    def component_size(self, obj):
+        """ return the number of nodes connected to obj (including obj) """
+        root = self._root(obj)
+        if root is None:
+            return 1
+        return len(self.members[root])
@@ -0,0 +1,311 @@
+from array import array
+from collections import deque
+from heapq import heappop, heappush
+
+from anygraph import vectorized
+
+inf = float('inf')
+
+
+class FrozenGraph(object):
+    """
+    Read-only snapshot of a graph, for fast analytics on graphs that do not change. Nodes are numbered 0 .. n-1 and the
+    edges are stored in compressed sparse row (CSR) form: the next nodes of node i are
+    'indices[offsets[i]:offsets[i + 1]]', with optional edge costs in 'weights' at the same positions.
+
+    All methods take and return node numbers; use 'index_of(node)' and 'nodes[i]' (or 'to_nodes(numbers)') to convert.
+    Methods that return a value for every node ('levels', 'components', 'pagerank') run vectorized with NumPy if it is
+    installed; zip the result with 'nodes' to map values to nodes. The snapshot does not follow changes in the graph;
+    freeze the graph again if it changes.
+    """
+
+    def __init__(self, nodes, iter_object, get_cost=None):
+        """
+        :param nodes: all nodes of the graph
+        :param iter_object: function returning the next nodes of a node
+        :param get_cost(node, next_node): optional cost function, to store edge costs in 'weights'
+        """
+        self.nodes = list(nodes)
+        self.index = {id(node): i for i, node in enumerate(self.nodes)}
+        self.offsets = array('l', [0])
+        self.indices = array('l')
+        self.weights = array('d') if get_cost else None
+        index = self.index
+        for node in self.nodes:
+            for next_node in iter_object(node):
+                j = index.get(id(next_node))
+                if j is None:
+                    continue  # not part of the snapshot
+                self.indices.append(j)
+                if get_cost:
+                    self.weights.append(get_cost(node, next_node))
+            self.offsets.append(len(self.indices))
+        self._reverse = None
+        self._numpy_arrays = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, obj):
+        return id(obj) in self.index
+
+    @property
+    def edge_count(self):
+        return len(self.indices)
+
+    def index_of(self, obj):
+        """ return the number of node obj in the snapshot """
+        return self.index[id(obj)]
+
+    def to_nodes(self, numbers):
+        """ return the nodes for the node numbers (e.g. a path) """
+        nodes = self.nodes
+        return [nodes[i] for i in numbers]
+
+    def neighbours(self, i):
+        """ return the numbers of the next nodes of node i """
+        return self.indices[self.offsets[i]:self.offsets[i + 1]]
+
+    def reverse(self):
+        """ return the snapshot with all edges reversed (created once) """
+        if self._reverse is None:
+            count, offsets, indices, weights = len(self.nodes), self.offsets, self.indices, self.weights
+            degrees = [0] * (count + 1)
+            for j in indices:
+                degrees[j + 1] += 1
+            for i in range(count):
+                degrees[i + 1] += degrees[i]
+            reverse = FrozenGraph.__new__(FrozenGraph)
+            reverse.nodes, reverse.index, reverse._reverse, reverse._numpy_arrays = self.nodes, self.index, self, None
+            reverse.offsets = array('l', degrees)
+            reverse.indices = array('l', bytes(indices.itemsize * len(indices)))
+            reverse.weights = array('d', bytes(weights.itemsize * len(weights))) if weights is not None else None
+            fill = degrees[:-1]
+            for i in range(count):
+                for position in range(offsets[i], offsets[i + 1]):
+                    j = indices[position]
+                    reverse.indices[fill[j]] = i
+                    if weights is not None:
+                        reverse.weights[fill[j]] = weights[position]
+                    fill[j] += 1
+            self._reverse = reverse
+        return self._reverse
+
+    def iterate(self, start, breadth_first=False):
+        """ iterate through the graph from node number start, in the same order as the linked graph """
+        offsets, indices = self.offsets, self.indices
+        seen = bytearray(len(self.nodes))
+        seen[start] = 1
+        if breadth_first:
+            queue = deque([start])
+            while queue:
+                i = queue.popleft()
+                yield i
+                for j in indices[offsets[i]:offsets[i + 1]]:
+                    if not seen[j]:
+                        seen[j] = 1
+                        queue.append(j)
+        else:
+            yield start
+            stack = [iter(indices[offsets[start]:offsets[start + 1]])]
+            while stack:
+                for j in stack[-1]:
+                    if not seen[j]:
+                        seen[j] = 1
+                        yield j
+                        stack.append(iter(indices[offsets[j]:offsets[j + 1]]))
+                        break
+                else:
+                    stack.pop()
+
+    def gather(self, start):
+        """ return the numbers of all nodes connected to node number start, following edges in both directions """
+        offsets, indices = self.offsets, self.indices
+        reverse = self.reverse()
+        back_offsets, back_indices = reverse.offsets, reverse.indices
+        seen = bytearray(len(self.nodes))
+        seen[start] = 1
+        gathered = [start]
+        for i in gathered:  # gathered grows while iterating
+            for j in indices[offsets[i]:offsets[i + 1]]:
+                if not seen[j]:
+                    seen[j] = 1
+                    gathered.append(j)
+            for j in back_indices[back_offsets[i]:back_offsets[i + 1]]:
+                if not seen[j]:
+                    seen[j] = 1
+                    gathered.append(j)
+        return gathered
+
+    def reachable(self, start, target):
+        """ return whether node number target can be reached from node number start (through at least one edge) """
+        offsets, indices = self.offsets, self.indices
+        seen = bytearray(len(self.nodes))
+        stack = [start]
+        while stack:
+            i = stack.pop()
+            for j in indices[offsets[i]:offsets[i + 1]]:
+                if j == target:
+                    return True
+                if not seen[j]:
+                    seen[j] = 1
+                    stack.append(j)
+        return False
+
+    def shortest_path(self, start, target):
+        """
+        return the shortest path from node number start to target as list of node numbers, or None if there is no path;
+        uses the stored edge costs if present (Dijkstra), otherwise the number of edges (breadth first search).
+        """
+        if start == target:
+            return [start]
+        if self.weights is None:
+            predecessors = self._breadth_first_search(start, target)
+        else:
+            predecessors = self._dijkstra_search(start, target)
+        if predecessors[target] < 0:
+            return None
+        path = [target]
+        while path[-1] != start:
+            path.append(predecessors[path[-1]])
+        path.reverse()
+        return path
+
+    def _breadth_first_search(self, start, target):
+        offsets, indices = self.offsets, self.indices
+        predecessors = [-1] * len(self.nodes)
+        predecessors[start] = start
+        queue = deque([start])
+        while queue:
+            i = queue.popleft()
+            for j in indices[offsets[i]:offsets[i + 1]]:
+                if predecessors[j] < 0:
+                    predecessors[j] = i
+                    if j == target:
+                        return predecessors
+                    queue.append(j)
+        return predecessors
+
+    def _dijkstra_search(self, start, target):
+        offsets, indices, weights = self.offsets, self.indices, self.weights
+        predecessors = [-1] * len(self.nodes)
+        costs = [inf] * len(self.nodes)
+        done = bytearray(len(self.nodes))
+        predecessors[start], costs[start] = start, 0
+        heap = [(0, start)]
+        while heap:
+            cost, i = heappop(heap)
+            if done[i]:
+                continue
+            if i == target:
+                break
+            done[i] = 1
+            for position in range(offsets[i], offsets[i + 1]):
+                j = indices[position]
+                next_cost = cost + weights[position]
+                if next_cost < costs[j]:
+                    costs[j] = next_cost
+                    predecessors[j] = i
+                    heappush(heap, (next_cost, j))
+        return predecessors
+
+    def path_cost(self, path):
+        """ return the total cost of the path (list of node numbers), using stored costs or the number of edges """
+        if self.weights is None:
+            return len(path) - 1
+        offsets, indices, weights = self.offsets, self.indices, self.weights
+        total = 0
+        for i, j in zip(path[:-1], path[1:]):
+            total += min(weights[p] for p in range(offsets[i], offsets[i + 1]) if indices[p] == j)
+        return total
+
+    def _vectorized(self, use_numpy):
+        """ numpy views of offsets and indices if numpy is to be used (None means: if available), otherwise None """
+        if use_numpy is None:
+            use_numpy = vectorized.numpy is not None
+        if not use_numpy:
+            return None
+        if self._numpy_arrays is None:
+            self._numpy_arrays = vectorized.as_numpy(self.offsets), vectorized.as_numpy(self.indices)
+        return self._numpy_arrays
+
+    def levels(self, sources, use_numpy=None):
+        """
+        Breadth first search from one or more node numbers at once.
+        :param sources: node number or iterable of node numbers to start from
+        :param use_numpy: whether to run vectorized with NumPy (default: if NumPy is installed)
+        :return: list with for every node the number of edges from the nearest source, -1 for nodes not reached
+        """
+        sources = [sources] if isinstance(sources, int) else list(sources)
+        arrays = self._vectorized(use_numpy)
+        if arrays is not None:
+            return vectorized.levels(*arrays, sources).tolist()
+        offsets, indices = self.offsets, self.indices
+        result = [-1] * len(self.nodes)
+        frontier = []
+        for i in sources:
+            if result[i] < 0:
+                result[i] = 0
+                frontier.append(i)
+        level = 0
+        while frontier:
+            level += 1
+            next_frontier = []
+            for i in frontier:
+                for j in indices[offsets[i]:offsets[i + 1]]:
+                    if result[j] < 0:
+                        result[j] = level
+                        next_frontier.append(j)
+            frontier = next_frontier
+        return result
+
+    def components(self, use_numpy=None):
+        """
+        Connected components, following edges in both directions.
+        :param use_numpy: whether to run vectorized with NumPy (default: if NumPy is installed)
+        :return: list with for every node the lowest node number in its component
+        """
+        arrays = self._vectorized(use_numpy)
+        if arrays is not None:
+            return vectorized.components(*arrays).tolist()
+        labels = [-1] * len(self.nodes)
+        for i in range(len(self.nodes)):
+            if labels[i] < 0:
+                for j in self.gather(i):
+                    labels[j] = i
+        return labels
+
+    def pagerank(self, damping=0.85, tolerance=1e-10, max_iterations=100, use_numpy=None):
+        """
+        PageRank of all nodes, by power iteration; the rank of nodes without next nodes is spread over all nodes.
+        :param damping: probability of following an edge (instead of jumping to a random node)
+        :param tolerance: iteration stops when the ranks change less than this (summed over all nodes)
+        :param max_iterations: maximum number of iterations
+        :param use_numpy: whether to run vectorized with NumPy (default: if NumPy is installed)
+        :return: list of ranks for every node, summing to 1
+        """
+        arrays = self._vectorized(use_numpy)
+        if arrays is not None:
+            return vectorized.pagerank(*arrays, damping, tolerance, max_iterations).tolist()
+        count, offsets, indices = len(self.nodes), self.offsets, self.indices
+        if not count:
+            return []
+        ranks = [1.0 / count] * count
+        for _ in range(max_iterations):
+            new_ranks = [0.0] * count
+            dangling = 0.0
+            for i in range(count):
+                start, end = offsets[i], offsets[i + 1]
+                if start == end:
+                    dangling += ranks[i]
+                    continue
+                share = ranks[i] / (end - start)
+                for position in range(start, end):
+                    new_ranks[indices[position]] += share
+            base = damping * dangling / count + (1 - damping) / count
+            new_ranks = [damping * rank + base for rank in new_ranks]
+            converged = sum(abs(new - old) for new, old in zip(new_ranks, ranks)) < tolerance
+            ranks = new_ranks
+            if converged:
+                break
+        return ranks
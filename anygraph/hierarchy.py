@@ -0,0 +1,190 @@
+from heapq import heappop, heappush, heapify
+
+inf = float('inf')
+
+
+class ContractionHierarchy(object):
+    """
+    Contraction hierarchy over a (static) graph, for fast repeated shortest path queries. On creation all nodes are
+    contracted one by one, in order of importance, adding shortcut edges where needed to preserve shortest paths
+    between the remaining nodes. Queries then only follow edges to more important nodes, from both ends, which
+    visits only a small part of the graph. Shortcuts are unpacked to return the full path.
+
+    The hierarchy does not follow changes in the graph after creation; create a new one if the graph changes.
+    """
+
+    def __init__(self, nodes, iter_object, get_cost, witness_limit=64):
+        """
+        :param nodes: all nodes of the graph
+        :param iter_object: function returning the next nodes of a node
+        :param get_cost(node, next_node): cost function: must return cost for following edge between node and next_node
+        :param witness_limit: max number of nodes settled in a local search for an alternative to a shortcut; higher
+            means fewer shortcuts (faster queries), but slower preprocessing.
+        """
+        self.nodes = list(nodes)
+        self.index = {id(node): i for i, node in enumerate(self.nodes)}
+        self.witness_limit = witness_limit
+        self.rank = [0] * len(self.nodes)
+        self.up_out = [()] * len(self.nodes)  # edges (to, cost) to more important nodes
+        self.up_in = [()] * len(self.nodes)  # edges (from, cost) from more important nodes
+        self.middle = {}  # (from, to) -> contracted node, for shortcut edges
+        self._contract(*self._edges(iter_object, get_cost))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, obj):
+        return id(obj) in self.index
+
+    def _edges(self, iter_object, get_cost):
+        index = self.index
+        out_edges = [{} for _ in self.nodes]
+        in_edges = [{} for _ in self.nodes]
+        for i, node in enumerate(self.nodes):
+            for next_node in iter_object(node):
+                j = index.get(id(next_node))
+                if j is None or j == i:
+                    continue
+                cost = get_cost(node, next_node)
+                if cost < out_edges[i].get(j, inf):
+                    out_edges[i][j] = in_edges[j][i] = cost
+        return out_edges, in_edges
+
+    def _witness_costs(self, out_edges, start, skip, max_cost, targets):
+        """
+        costs of the shortest paths from start, not passing 'skip', up to max_cost and witness_limit nodes; stops when
+        all targets are settled
+        """
+        costs = {start: 0}
+        heap = [(0, start)]
+        done = set()
+        remaining = len(targets)
+        while heap and len(done) < self.witness_limit:
+            cost, i = heappop(heap)
+            if i in done:
+                continue
+            if cost > max_cost:
+                break
+            done.add(i)
+            if i in targets:
+                remaining -= 1
+                if not remaining:
+                    break
+            for j, edge_cost in out_edges[i].items():
+                next_cost = cost + edge_cost
+                if j != skip and next_cost < costs.get(j, inf):
+                    costs[j] = next_cost
+                    heappush(heap, (next_cost, j))
+        return costs
+
+    def _shortcuts(self, out_edges, in_edges, v):
+        """ shortcuts (from, to, cost) needed to contract node v """
+        shortcuts = []
+        outs = out_edges[v]
+        if not outs:
+            return shortcuts
+        max_out = max(outs.values())
+        for u, cost_uv in in_edges[v].items():
+            costs = self._witness_costs(out_edges, u, v, cost_uv + max_out, outs)
+            for w, cost_vw in outs.items():
+                if w != u and costs.get(w, inf) > cost_uv + cost_vw:
+                    shortcuts.append((u, w, cost_uv + cost_vw))
+        return shortcuts
+
+    def _contract(self, out_edges, in_edges):
+        deleted = [0] * len(self.nodes)  # number of contracted neighbours, to spread contraction over the graph
+
+        def priority(v):
+            shortcuts = self._shortcuts(out_edges, in_edges, v)
+            return len(shortcuts) - len(out_edges[v]) - len(in_edges[v]) + deleted[v], shortcuts
+
+        heap = [(priority(v)[0], v) for v in range(len(self.nodes))]
+        heapify(heap)
+        rank = 0
+        while heap:
+            _, v = heappop(heap)
+            prio, shortcuts = priority(v)  # lazy update: priorities change when neighbours are contracted
+            if heap and prio > heap[0][0]:
+                heappush(heap, (prio, v))
+                continue
+
+            for u, w, cost in shortcuts:
+                if cost < out_edges[u].get(w, inf):
+                    out_edges[u][w] = in_edges[w][u] = cost
+                    self.middle[u, w] = v
+
+            self.up_out[v] = tuple(out_edges[v].items())
+            self.up_in[v] = tuple(in_edges[v].items())
+            for w in out_edges[v]:
+                del in_edges[w][v]
+                deleted[w] += 1
+            for u in in_edges[v]:
+                del out_edges[u][v]
+                deleted[u] += 1
+            out_edges[v] = in_edges[v] = None
+            self.rank[v] = rank
+            rank += 1
+
+    def _search(self, start, target):
+        """ bidirectional upward search; returns cost, meeting node and predecessors of both searches """
+        costs = ({start: 0}, {target: 0})
+        preds = ({start: None}, {target: None})
+        heaps = ([(0, start)], [(0, target)])
+        edges = (self.up_out, self.up_in)
+        best_cost, meet = (0, start) if start == target else (inf, None)
+        while heaps[0] or heaps[1]:
+            side = 0 if heaps[0] and (not heaps[1] or heaps[0][0][0] <= heaps[1][0][0]) else 1
+            cost, i = heappop(heaps[side])
+            if cost >= best_cost:  # keys are popped in increasing order: this side is done
+                del heaps[side][:]
+                continue
+            side_costs, other_costs, side_preds = costs[side], costs[1 - side], preds[side]
+            if cost > side_costs[i]:
+                continue
+            for j, edge_cost in edges[side][i]:
+                next_cost = cost + edge_cost
+                if next_cost < side_costs.get(j, inf):
+                    side_costs[j] = next_cost
+                    side_preds[j] = i
+                    heappush(heaps[side], (next_cost, j))
+                    if j in other_costs and next_cost + other_costs[j] < best_cost:
+                        best_cost, meet = next_cost + other_costs[j], j
+        return best_cost, meet, preds
+
+    def _unpack(self, i, j):
+        """ unpack the (shortcut) edge i -> j into the indices of the original path, without i """
+        path = []
+        stack = [(i, j)]
+        while stack:
+            i, j = stack.pop()
+            k = self.middle.get((i, j))
+            if k is None:
+                path.append(j)
+            else:
+                stack.append((k, j))
+                stack.append((i, k))
+        return path
+
+    def cost(self, start_obj, target_obj):
+        """ return the cost of the shortest path from start_obj to target_obj, or None if there is no path """
+        cost, _, _ = self._search(self.index[id(start_obj)], self.index[id(target_obj)])
+        return None if cost == inf else cost
+
+    def shortest_path(self, start_obj, target_obj):
+        """ return the shortest path from start_obj to target_obj as a list of nodes, or None if there is no path """
+        start, target = self.index[id(start_obj)], self.index[id(target_obj)]
+        cost, meet, (forward_preds, backward_preds) = self._search(start, target)
+        if meet is None:
+            return None
+
+        hops = [meet]
+        while forward_preds[hops[-1]] is not None:
+            hops.append(forward_preds[hops[-1]])
+        hops.reverse()
+        while backward_preds[hops[-1]] is not None:
+            hops.append(backward_preds[hops[-1]])
+
+        path = [start]
+        for i, j in zip(hops[:-1], hops[1:]):
+            path.extend(self._unpack(i, j))
+        return [self.nodes[i] for i in path]
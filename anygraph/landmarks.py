@@ -0,0 +1,70 @@
+inf = float('inf')
+
+
+class Landmarks(object):
+    """
+    Heuristic for A* (ALT: A*, landmarks and the triangle inequality), computed from the graph itself. For a few
+    landmark nodes the costs from (and, if the graph has a reverse relationship, to) every node are precomputed. For
+    any landmark L, both cost(L, target) - cost(L, node) and cost(node, L) - cost(target, L) are lower estimates of
+    cost(node, target); the heuristic returns the largest of these.
+
+    Instances are callable as 'heuristic(node, target_node)' and can be passed directly to 'shortest_path'. They
+    do not follow changes in the graph; create new landmarks if the graph changes.
+    """
+
+    def __init__(self, nodes, iterator, get_cost, count=8, reverse_iterator=None):
+        """
+        :param nodes: nodes of the graph, to pick landmarks from
+        :param iterator: iterator following the graph forward
+        :param get_cost(node, next_node): cost function as in 'shortest_path'
+        :param count: number of landmarks (more gives better estimates, but takes more memory and time)
+        :param reverse_iterator: optional iterator following the graph backward, to also compute costs to landmarks
+        """
+        self.landmarks = []
+        self.costs_from = {}  # id(node) -> list of costs from each landmark
+        self.costs_to = {}  # id(node) -> list of costs to each landmark
+        self._select(list(nodes), iterator, get_cost, count, reverse_iterator)
+
+    def _select(self, nodes, iterator, get_cost, count, reverse_iterator):
+        """ farthest point selection: each next landmark is the node farthest from the landmarks selected so far """
+        if not nodes:
+            return
+
+        def reverse_cost(obj, prev_obj):
+            return get_cost(prev_obj, obj)
+
+        closest = {id(node): inf for node in nodes}
+        start_tree = iterator.shortest_path_tree(nodes[0], get_cost=get_cost)
+        landmark = max(start_tree, key=start_tree.cost)
+        for i in range(min(count, len(nodes))):
+            self.landmarks.append(landmark)
+            from_tree = iterator.shortest_path_tree(landmark, get_cost=get_cost)
+            to_tree = reverse_iterator.shortest_path_tree(landmark, get_cost=reverse_cost) if reverse_iterator else None
+            for node in nodes:
+                node_id = id(node)
+                cost_from = from_tree.cost(node)
+                cost_to = to_tree.cost(node) if to_tree else None
+                self.costs_from.setdefault(node_id, []).append(inf if cost_from is None else cost_from)
+                self.costs_to.setdefault(node_id, []).append(inf if cost_to is None else cost_to)
+                closest[node_id] = min(closest[node_id], inf if cost_from is None else cost_from,
+                                       inf if cost_to is None else cost_to)
+            landmark = max(nodes, key=lambda n: closest[id(n)])  # unreached nodes (inf) first
+            if not closest[id(landmark)]:
+                break  # all nodes are landmarks
+
+    def __len__(self):
+        return len(self.landmarks)
+
+    def __call__(self, obj, target_obj):
+        """ lower estimate of the cost of the shortest path from obj to target_obj """
+        estimate = 0
+        obj_id, target_id = id(obj), id(target_obj)
+        if obj_id not in self.costs_from or target_id not in self.costs_from:
+            return estimate
+        for from_obj, from_target in zip(self.costs_from[obj_id], self.costs_from[target_id]):
+            if from_target - from_obj > estimate and from_target < inf:
+                estimate = from_target - from_obj
+        for obj_to, target_to in zip(self.costs_to[obj_id], self.costs_to[target_id]):
+            if obj_to - target_to > estimate and obj_to < inf:
+                estimate = obj_to - target_to
+        return estimate
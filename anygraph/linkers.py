@@ -1,10 +1,26 @@
+import asyncio
+import os
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from collections.abc import Set, Mapping
+from contextlib import contextmanager
 from functools import partial, wraps
+from heapq import heappop, heappush
+from inspect import isawaitable
+from itertools import count
 from operator import attrgetter
+from weakref import WeakValueDictionary
 
-from anygraph.tools import unique_name, save_graph_image
-from anygraph.visitors import Iterator, Visitor
+from anygraph.components import ComponentTracker
+from anygraph.frozen import FrozenGraph
+from anygraph.hierarchy import ContractionHierarchy
+from anygraph.landmarks import Landmarks
+from anygraph.pickling import link_table, dump_graph, load_graph
+from anygraph.reachability import Condensation, ReachabilityIndex
+from anygraph.registry import NodeRegistry
+from anygraph.store import GraphStore
+from anygraph.tools import unique_name, save_graph_image, LRUCache
+from anygraph.visitors import Iterator, NumberedIterator, Visitor, MultiVisitor
 
 
 class BaseDelegate(object):
@@ -20,19 +36,41 @@ class BaseDelegate(object):
         return len(self.targets)
 
     def include(self, *targets):
-        """ adds and connects targets to the object owning this instance (self.owner) """
+        """
+        Adds and connects targets to the object owning this instance (self.owner). All new links are validated
+        before any of them is made.
+        """
+        targets = self._unique_targets(targets, skip_existing=True)
+        self.linker._check(self.owner, *targets)
+        self._include(targets)
+
+    def _unique_targets(self, targets, skip_existing=False):
+        """ targets without None and duplicates (by identity), optionally without already linked targets """
+        get_id, existing, seen = self.get_id, self.targets, set()
+        unique_targets = []
         for target in targets:
-            if target is not None and target not in self.targets.values():
-                self.linker._check(self.owner, target)
-                self.linker._link(self.owner, target)
-                self.linker._on_link(self.owner, target)
+            if target is None or id(target) in seen:
+                continue
+            if skip_existing and existing.get(get_id(target)) is target:
+                continue
+            seen.add(id(target))
+            unique_targets.append(target)
+        return unique_targets
+
+    def _include(self, targets):
+        """ links (already validated) targets """
+        owner, linker = self.owner, self.linker
+        for target in targets:
+            linker._link(owner, target)
+            linker._on_link(owner, target)
 
     def exclude(self, *targets):
         """ removes and disconnects targets from the object owning this instance (self.owner) """
+        owner, linker, get_id, existing = self.owner, self.linker, self.get_id, self.targets
         for target in targets:
-            if target is not None and target in self.targets.values():
-                self.linker._on_unlink(self.owner, target)
-                self.linker._unlink(self.owner, target)
+            if target is not None and existing.get(get_id(target)) is target:
+                linker._on_unlink(owner, target)
+                linker._unlink(owner, target)
 
     def clear(self):
         """ removes all targets """
@@ -44,6 +82,22 @@ class BaseDelegate(object):
     def _del(self, target):
         self.targets.pop(self.get_id(target), None)
 
+    def __reduce__(self):
+        """
+        pickles (and deep-copies) the delegate without the linker (a class attribute of the owner) and with the links of
+        the whole graph in a flat LinkTable shared by all delegates in the graph, so pickling does not recurse through
+        the graph
+        """
+        return _new_delegate, (self.owner, self.linker.name), self.linker._link_table(self.owner)
+
+    def __setstate__(self, table):
+        table.restore(self)
+
+
+def _new_delegate(owner, name):
+    """ creates an (empty) delegate for graph 'name' of owner, used when unpickling """
+    return getattr(owner.__class__, name)._new_delegate(owner)
+
 
 class DelegateSet(BaseDelegate, Set):
 
@@ -103,16 +157,267 @@ class DelegateMap(BaseDelegate, Mapping):
         return repr(self.targets)
 
 
+class LazyDelegate(BaseDelegate):
+    """
+    Delegate of which the targets are loaded on first access, with the loader of the linker (see BaseMany). Loaded
+    targets that have not been changed can be dropped by the linker (when they are evicted from its LRU) and are then
+    loaded again on the next access.
+    """
+
+    def __init__(self, owner, linker):
+        super().__init__(owner, linker)
+        self._targets = None  # not loaded
+
+    @property
+    def targets(self):
+        if self._targets is None:
+            self._targets = self.linker._load(self)
+        else:
+            self.linker._touch(self)
+        return self._targets
+
+    @targets.setter
+    def targets(self, targets):
+        self._targets = targets
+
+    def _set(self, target):
+        super()._set(target)
+        self.linker._pin(self)
+
+    def _del(self, target):
+        super()._del(target)
+        self.linker._pin(self)
+
+
+class LazyDelegateSet(LazyDelegate, DelegateSet):
+    pass
+
+
+class LazyDelegateMap(LazyDelegate, DelegateMap):
+    pass
+
+
+def _order_key(name):
+    return f'_{name}_order'
+
+
+def _cache_key(name, what):
+    return f'_{name}_cached_{what}'
+
+
+class _Cached(object):
+    """
+    value cached on the nodes of graph version 'version', so it is freed with the nodes; it is not pickled or copied
+    with the nodes (it unpickles as None)
+    """
+    __slots__ = ('version', 'value')
+
+    def __init__(self, version, value):
+        self.version = version
+        self.value = value
+
+    def __reduce__(self):
+        return type(None), ()
+
+
+def _update_order(name, sources, targets, saved=None, iter_object=None):
+    """
+    Maintains a topological order of the nodes in the acyclic graph 'name' when edges from all sources to all targets
+    are added (in practice either sources or targets is a single node). The order is an int stored in the __dict__ of
+    each node. Targets not ordered after the sources are raised, together with their successors, visiting only the
+    nodes of which the order must change, in the original topological order (so each node is visited once).
+    Nodes without an order are placed before the targets (sources) or after the sources (targets, followed by their
+    next nodes), which is only valid if they were never linked without keeping the order: a source without an order
+    that already has next nodes (e.g. linked by a cyclic linker of another class or loaded) makes the order unusable.
+    :param saved: optional dict in which the original order of each changed node is saved (e.g. by a transaction)
+    :param iter_object: optional (faster) function iterating over the next nodes of a node in the graph
+    :return: False (with the order left unchanged) if the edges would create a cycle, None (idem) if the order cannot
+        be used, else True
+    """
+    key = _order_key(name)
+    iter_object = iter_object or Iterator(name).iter_object
+    for source in sources:
+        if key not in source.__dict__ and next(iter_object(source), None) is not None:
+            return None
+
+    def save(node):
+        if saved is not None and (key, id(node)) not in saved:
+            saved[key, id(node)] = (node, key, node.__dict__.get(key))
+
+    target_orders = [t.__dict__[key] for t in targets if key in t.__dict__]
+    fresh_order = min(target_orders) - 1 if target_orders else 0
+    for source in sources:
+        if key not in source.__dict__:  # node never linked in this graph: put before targets
+            save(source)
+            source.__dict__[key] = fresh_order
+    max_order = max(source.__dict__[key] for source in sources)
+
+    counter = count()
+    journal = {}  # original orders, to roll back on cycle detection
+    heap = []
+    for target in targets:
+        target_order = target.__dict__.get(key)
+        if (target_order is None or target_order <= max_order) and id(target) not in journal:
+            journal[id(target)] = (target, target_order)
+            heappush(heap, (max_order if target_order is None else target_order, next(counter), target))
+            save(target)
+            target.__dict__[key] = max_order + 1
+
+    source_ids = {id(source) for source in sources}
+    while heap:
+        _, _, obj = heappop(heap)
+        obj_order = obj.__dict__[key]
+        for next_obj in iter_object(obj):
+            if id(next_obj) in source_ids:
+                for node, order in journal.values():
+                    if order is None:
+                        del node.__dict__[key]
+                    else:
+                        node.__dict__[key] = order
+                return False
+            next_dict = next_obj.__dict__
+            next_order = next_dict.get(key)
+            if next_order is None or next_order <= obj_order:
+                if id(next_obj) not in journal:
+                    journal[id(next_obj)] = (next_obj, next_order)
+                    heappush(heap, (obj_order if next_order is None else next_order, next(counter), next_obj))
+                save(next_obj)
+                next_dict[key] = obj_order + 1
+    return True
+
+
+def _reaches(name, starts, targets):
+    """ whether any of targets can be reached from (or is one of) starts in the graph 'name'; without using orders """
+    target_ids = {id(target) for target in targets}
+    iter_object = Iterator(name).iter_object
+    seen = set()
+    stack = list(starts)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in target_ids:
+            return True
+        if id(obj) not in seen:
+            seen.add(id(obj))
+            stack.extend(iter_object(obj))
+    return False
+
+
+def _iter_object_function(name):
+    """
+    Returns a function iterating over the next nodes of a node in the graph with this name, equivalent to
+    Iterator(name).iter_object, but reading the links directly from obj.__dict__. Per class of node it is determined
+    (once) whether the attribute is a One or Many(Map) linker, so graphs with nodes of different classes are supported;
+    for other attributes and lazy Many linkers (with a loader, so the links are loaded on first access) it falls back to
+    Iterator(name).iter_object.
+    """
+    generic = Iterator(name).iter_object
+    kinds = {}  # class -> One, BaseMany or None
+
+    def kind(cls):
+        linker = getattr(cls, name, None)
+        if isinstance(linker, One):
+            kinds[cls] = One
+        elif isinstance(linker, BaseMany) and linker._loader is None:
+            kinds[cls] = BaseMany
+        else:
+            kinds[cls] = None
+
+        return kinds[cls]
+
+    def iter_object(obj):
+        cls = obj.__class__
+        linker_type = kinds[cls] if cls in kinds else kind(cls)
+        if linker_type is BaseMany:
+            delegate = obj.__dict__.get(name)
+            return iter(()) if delegate is None else iter(delegate.targets.values())  # None: not initialized yet
+        if linker_type is One:
+            target = obj.__dict__.get(name)
+            return iter(()) if target is None else iter((target,))
+        return generic(obj)
+
+    return iter_object
+
+
+async def _resolve(targets):
+    """ awaits targets if awaitable and collects them in a list if it is an async iterable """
+    if isawaitable(targets):
+        targets = await targets
+    if hasattr(targets, '__aiter__'):
+        return [target async for target in targets]
+    return targets
+
+
+class Transaction(object):
+    """
+    Journal of the changes made to a graph within 'BaseLinker.transaction()'. Before a node is first changed, its
+    links (and its topological order in acyclic graphs) are saved, so the transaction can be rolled back to the saved
+    state. The on_link and on_unlink callbacks
+    are deferred to commit, and only called for the net changes: e.g. a link that is made and then broken again
+    within the transaction results in no callbacks.
+    """
+
+    def __init__(self):
+        self.saved = {}  # (id(linker), id(obj)) -> (linker, obj, saved links)
+        self.events = {}  # (id(linker), id(obj), id(target)) -> (first event, last event, linker, obj, target)
+        self.orders = {}  # (order key, id(obj)) -> (obj, order key, saved order or None), see _update_order
+
+    def save(self, linker, obj):
+        key = (id(linker), id(obj))
+        if key not in self.saved:
+            self.saved[key] = (linker, obj, linker._save(obj))
+
+    def record(self, event, linker, obj, target):
+        key = (id(linker), id(obj), id(target))
+        first = self.events[key][0] if key in self.events else event
+        self.events[key] = (first, event, linker, obj, target)
+
+    def rollback(self):
+        for linker, obj, saved in self.saved.values():
+            linker._restore(obj, saved)
+            linker._changed()
+            tracker = linker._tracker(obj)
+            if tracker is not None:
+                for target in Iterator(linker.name).iter_object(obj):
+                    tracker.link(obj, target)
+                tracker.unlink(obj)
+        for obj, key, order in self.orders.values():
+            if order is None:
+                obj.__dict__.pop(key, None)
+            else:
+                obj.__dict__[key] = order
+        self.saved.clear()
+        self.events.clear()
+        self.orders.clear()
+
+    def commit(self):
+        events = list(self.events.values())
+        self.saved.clear()
+        self.events.clear()
+        self.orders.clear()
+        for first, last, linker, obj, target in events:
+            if first == last == 'link':
+                linker._on_link(obj, target, _deferred=True)
+            elif first == last == 'unlink':
+                linker._on_unlink(obj, target, _deferred=True)
+
+
 class BaseLinker(object):
     """
     Baseclass for One and Many descriptors, with shared functionality.
     """
     get_id = id  # default
-
-    _installables = ('iterate', 'visit', 'build', 'gather', 'gather_pairs', 'find', 'reachable', 'walk',
-                     'endpoints', 'is_cyclic', 'in_cycle', 'shortest_path', 'shortest_paths', 'save_image')
-
-    def __init__(self, reverse_name=None, cyclic=True, to_self=True, on_link=None, on_unlink=None, install=False, get_id=None, **kwargs):
+    _transaction = None  # set while a transaction is active
+    _versions = {}  # version of each graph (by name), changed on every link and unlink
+    _ordered_names = set()  # names of the graphs in which a topological order is kept on the nodes (see _update_order)
+    _unordered_names = set()  # names of these graphs in which links were made without keeping the order
+
+    _installables = ('iterate', 'depth_first_events', 'visit', 'build', 'gather', 'gather_pairs', 'find', 'reachable',
+                     'walk', 'endpoints', 'is_cyclic', 'in_cycle', 'strongly_connected_components', 'condensation',
+                     'same_component', 'component_size', 'shortest_path', 'shortest_paths', 'shortest_path_tree',
+                     'preprocess_hierarchy', 'build_landmarks', 'save_image', 'abuild', 'aiterate')
+
+    def __init__(self, reverse_name=None, cyclic=True, to_self=True, on_link=None, on_unlink=None, install=False, get_id=None,
+                 path_cache=None, reach_index=False, track_components=False, number_nodes=False, **kwargs):
         """
         :param reverse_name: optional name of the reverse relationship
         :param cyclic: whether the graph is allowed to be cyclic
@@ -120,6 +425,14 @@ class BaseLinker(object):
         :param on_link(obj, next_obj): optional callback called just before a connection is made
         :param on_unlink(obj, next_obj): optional callback called just before a connection is broken
         :param get_id(obj): optional alternative callback to uniquely identify nodes
+        :param path_cache: optional maximum number of results of 'shortest_path' to cache, until the graph changes
+        :param reach_index: whether to answer 'reachable' and 'in_cycle' with an index, rebuilt when the graph changes
+        :param track_components: whether to keep track of the connected components of the graph while it changes, to
+            answer 'gather', 'same_component' and 'component_size' without searching the graph; needs reverse_name.
+            Cached results (path_cache, reach_index, condensation) are then only invalidated by changes in their own
+            component, instead of by any change in any graph with the same name.
+        :param number_nodes: whether to number nodes when they are linked, so 'iterate', 'gather', 'reachable' and
+            'shortest_path' can use arrays indexed by node number instead of sets and dicts, using less memory
         """
         super().__init__(**kwargs)
         self.reverse_name = reverse_name
@@ -130,6 +443,59 @@ class BaseLinker(object):
         self._install = install
         self.get_id = get_id or self.get_id
         self.name = None
+        self._path_cache = LRUCache(path_cache) if path_cache else None
+        self._path_cache_version = None
+        self._reach_index = reach_index
+        if track_components and not reverse_name:
+            raise ValueError("'track_components' needs a 'reverse_name' to follow the graph in both directions")
+        self._track_components = track_components
+        self._number_nodes = number_nodes
+        self._components = None  # ComponentTracker, shared with the reverse relationship
+        self._numbers = None  # NodeRegistry, shared with the reverse relationship
+        self._iter_object = self._iter_reverse = None  # set in __set_name__
+        self._stores = {}  # path -> GraphStore
+        self._link_tables = WeakValueDictionary()  # id(node) -> LinkTable, while pickling delegates
+        self._link_tables_version = None
+
+    @property
+    def version(self):
+        """ version of the graph; changes on every link or unlink in any graph with the same name """
+        return BaseLinker._versions.get(self.name, 0)
+
+    def _version(self, obj):
+        """
+        version of the graph of obj, for cached results: the version of its connected component if components are
+        tracked, otherwise 'version', which also changes on links in unrelated graphs with the same name
+        """
+        tracker = self._tracker(obj)
+        if tracker is None:
+            return self.version
+        return tracker.version(obj)
+
+    def _tracker(self, obj):
+        """ the component tracker of this graph (set on this or on the reverse relationship of obj), or None """
+        if self._components is None and self.reverse_name:
+            return getattr(getattr(obj.__class__, self.reverse_name, None), '_components', None)
+        return self._components
+
+    def _registry(self, obj):
+        """ the node registry of this graph (set on this or on the reverse relationship of obj), or None """
+        if self._numbers is None and self.reverse_name:
+            return getattr(getattr(obj.__class__, self.reverse_name, None), '_numbers', None)
+        return self._numbers
+
+    def _iterator(self, obj=None):
+        """ iterator following this graph, using node numbers if 'number_nodes' is set (and obj is given) """
+        registry = self._registry(obj) if obj is not None else None
+        if registry is not None:
+            return NumberedIterator(self.name, registry, iter_object=self._iter_object)
+        return Iterator(self.name, iter_object=self._iter_object)
+
+    def _reverse_iterator(self):
+        """ iterator following the reverse graph, or None """
+        if self.reverse_name is None:
+            return None
+        return Iterator(self.reverse_name, iter_object=self._iter_reverse)
 
     @property
     def is_directed(self):
@@ -146,6 +512,25 @@ class BaseLinker(object):
 
     def __set_name__(self, cls, name):
         self.name = name  # sets the name of the attribute when the interpreter first encounters the descriptor in a class
+        self._iter_object = _iter_object_function(name)
+        self._iter_reverse = _iter_object_function(self.reverse_name) if self.reverse_name else None
+        reverse = cls.__dict__.get(self.reverse_name) if self.reverse_name else None  # if already set in cls
+        if self._track_components:
+            if getattr(reverse, '_components', None) is not None:
+                self._components = reverse._components
+            else:
+                iter_forw, iter_back = self._iter_object, self._iter_reverse
+
+                def iter_neighbours(obj):
+                    yield from iter_forw(obj)
+                    yield from iter_back(obj)
+
+                self._components = ComponentTracker(iter_neighbours)
+        if self._number_nodes:
+            if getattr(reverse, '_numbers', None) is not None:
+                self._numbers = reverse._numbers
+            else:
+                self._numbers = NodeRegistry(name)
         if self.installables:
             if getattr(cls, '_installed_graph', False):  # there can be only one graph installed
                 raise ValueError(f"cannot install graph '{name}', other graph '{cls._installed_graph.name}' already installed")
@@ -169,105 +554,341 @@ class BaseLinker(object):
         except KeyError:
             return self._init(obj)  # initializes attribute on first access
 
-    def iterate(self, start_obj, cyclic=False, breadth_first=False):
+    def iterate(self, start_obj, cyclic=False, breadth_first=False, max_depth=None, prune=None, max_nodes=None):
         """
         iterate through the graph
         :param start_obj: starting object from which the graph is followed
         :param cyclic: whether nodes in the graph will be repeated
         :param breadth_first: depth_first iteration if false (default) else breadth_first iteration
+        :param max_depth: optional max number of edges from start_obj; nodes further away are not visited
+        :param prune(node): optional function; if it returns True, the graph is not followed past node
+        :param max_nodes: optional max number of nodes to visit
         :yield: nodes in the graph
         """
-        yield from Iterator(self.name).iterate(start_obj, cyclic=cyclic, breadth_first=breadth_first)
+        yield from self._iterator(start_obj).iterate(start_obj, cyclic=cyclic, breadth_first=breadth_first,
+                                                     max_depth=max_depth, prune=prune, max_nodes=max_nodes)
 
     __call__ = iterate  # shortcut to iteration
 
-    def visit(self, start_obj, on_visit, cyclic=False, breadth_first=False):
-        """ apply 'on_visit(obj, next_obj)' on the graph, other arguments as in 'iterate' """
-        visitor = Visitor(self.name)
-        return visitor(start_obj, on_visit, cyclic=cyclic, breadth_first=breadth_first)
+    def depth_first_events(self, start_obj):
+        """
+        lazy depth first search, yielding tuples (event, node, depth, parent), with event one of 'discover' (pre-order),
+        'finish' (post-order), 'back' (edge to a node still being searched, closing a cycle) or 'cross' (edge to a node
+        already finished); see Iterator.depth_first_events
+        """
+        yield from self._iterator().depth_first_events(start_obj)
+
+    def visit(self, start_obj, on_visit, cyclic=False, breadth_first=False, **limits):
+        """ apply 'on_visit(obj, next_obj)' on the graph, other arguments (max_depth, prune, max_nodes) as in 'iterate' """
+        visitor = Visitor(self.name, iter_object=self._iter_object)
+        return visitor(start_obj, on_visit, cyclic=cyclic, breadth_first=breadth_first, **limits)
 
-    def build(self, start_obj, key='__iter__'):
+    def run(self, start_obj, *visitors, cyclic=False, breadth_first=False, **limits):
+        """
+        Runs all visitors (e.g. Find, FindOne, GetEndpoints, Count) in a single pass through the graph; visitors that are
+        done (e.g. FindOne after finding a node) are skipped and the pass ends when all are done.
+        :param start_obj: node to start from
+        :param visitors: instances of BaseVisitor subclasses
+        :param cyclic, breadth_first, limits (max_depth, prune, max_nodes): as in 'iterate'
+        :return: list of results of the visitors, in the same order
+        """
+        visitor = MultiVisitor(self.name, visitors, iter_object=self._iter_object)
+        return visitor(start_obj, cyclic=cyclic, breadth_first=breadth_first, **limits)
+
+    def build(self, start_obj, key='__iter__', workers=None):
         """
         Build a graph using a key function to find next nodes.
         :param start_obj: entry point object for which the graph is built
         :param key: if str: use attribute with name 'key' of encountered objects to find next objects,
                     if callable: must return the (an iterable of) the next objects in the graph
+        :param workers: optional number of threads to call key on concurrently (for all nodes at the same depth), e.g.
+            when key does I/O; linking is still done on the calling thread, in the same order as without workers.
         :return: self: to chain a call to another method if you like.
         """
+        if workers:
+            self._build_concurrent(start_obj, key, workers)
+            return self
         build_on_visit = self._build_on_visit(key, _reg={})
         self.visit(start_obj, on_visit=build_on_visit, breadth_first=True)
         return self
 
-    def gather(self, start_obj):  # bit slow
+    def _build_concurrent(self, start_obj, key, workers):
+        """ breadth first, level by level: key is called for a level on the thread pool, then the level is linked """
+        call_key, link_targets = self._build_functions(key, _reg={})
+
+        def find_targets(obj):
+            return self._collect_targets(call_key(obj))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for level in self._build_levels(start_obj):
+                for obj, targets in zip(level, executor.map(find_targets, level)):
+                    link_targets(obj, targets)
+
+    async def abuild(self, start_obj, key='__iter__', concurrency=64):
+        """
+        Build a graph like 'build', with a key function that can be async (a coroutine function or returning an async
+        iterable), without blocking the event loop. Key is called concurrently for all nodes at the same depth; the nodes
+        are linked in the same order as with 'build'.
+        :param start_obj: entry point object for which the graph is built
+        :param key: as in 'build', may also be async
+        :param concurrency: maximum number of calls to key running at the same time
+        :return: self: to chain a call to another method if you like.
+        """
+        call_key, link_targets = self._build_functions(key, _reg={})
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def find_targets(obj):
+            async with semaphore:
+                return self._collect_targets(await _resolve(call_key(obj)))
+
+        for level in self._build_levels(start_obj):
+            for obj, targets in zip(level, await asyncio.gather(*map(find_targets, level))):
+                link_targets(obj, targets)
+        return self
+
+    def _build_levels(self, start_obj):
+        """ yields the nodes in the graph level by level; the next level is found after the previous level is built """
+        iter_object = self._iter_object
+        seen = {id(start_obj)}
+        level = [start_obj]
+        while level:
+            yield level
+            next_level = []
+            for obj in level:
+                for next_obj in iter_object(obj):
+                    if id(next_obj) not in seen:
+                        seen.add(id(next_obj))
+                        next_level.append(next_obj)
+            level = next_level
+
+    async def aiterate(self, start_obj, key=None, breadth_first=False):
         """
-        Gather all nodes in a graph, going forward and backward if reverse_name is defined.
+        async iteration through the graph (not repeating nodes), e.g. 'async for node in Node.nexts.aiterate(start)'
+        :param start_obj: starting object from which the graph is followed
+        :param key(obj): optional (async) function returning (an iterable or async iterable of) the next nodes of obj,
+            for graphs where the next nodes are resolved asynchronously; default: the nodes linked in the graph
+        :param breadth_first: depth_first iteration if false (default) else breadth_first iteration
+        :yield: nodes in the graph
         """
+        if key is None:
+            key = self._iter_object
+
+        async def next_objects(obj):
+            return await _resolve(key(obj))
+
+        seen = {id(start_obj)}
+        if breadth_first:
+            queue = deque([start_obj])
+            while queue:
+                obj = queue.popleft()
+                yield obj
+                for next_obj in await next_objects(obj):
+                    if id(next_obj) not in seen:
+                        seen.add(id(next_obj))
+                        queue.append(next_obj)
+        else:
+            yield start_obj
+            stack = [iter(tuple(await next_objects(start_obj)))]  # copied: links can change while iterating
+            while stack:
+                for next_obj in stack[-1]:
+                    if id(next_obj) not in seen:
+                        seen.add(id(next_obj))
+                        yield next_obj
+                        stack.append(iter(tuple(await next_objects(next_obj))))
+                        break
+                else:
+                    stack.pop()
+
+    def gather(self, start_obj, **limits):
+        """
+        Gather all nodes in a graph, going forward and backward if reverse_name is defined; limits (max_depth, prune,
+        max_nodes) as in 'iterate'.
+        """
+        if any(limit is not None for limit in limits.values()):
+            return self._gather_limited(start_obj, **limits)
+        tracker = self._tracker(start_obj)
+        if tracker is not None:
+            return tracker.component(start_obj)
+        registry = self._registry(start_obj)
+        if registry is not None:
+            return self._gather_numbered(start_obj, registry)
         get_id = self.get_id
 
-        forw_iterator = Iterator(self.name)
-        back_iterator = Iterator(self.reverse_name) if self.reverse_name else None
+        forw_iterator = self._iterator()
+        back_iterator = self._reverse_iterator()
 
-        gathered = {}
+        gathered = {get_id(start_obj): start_obj}  # nodes are gathered when queued, so they are queued once
         queue = deque([start_obj])
         while len(queue):
             obj = queue.popleft()
-            gathered[get_id(obj)] = obj
 
             for forw_obj in forw_iterator.iter_object(obj):
                 if get_id(forw_obj) not in gathered:
+                    gathered[get_id(forw_obj)] = forw_obj
                     queue.append(forw_obj)
 
             if back_iterator:
                 for back_obj in back_iterator.iter_object(obj):
                     if get_id(back_obj) not in gathered:
+                        gathered[get_id(back_obj)] = back_obj
                         queue.append(back_obj)
 
         return list(gathered.values())
 
-    def gather_pairs(self, start_obj):  # bit slow
+    def _gather_limited(self, start_obj, **limits):
+        """ as 'gather', breadth first within limits """
+        iter_forw, iter_back = self._iter_object, self._iter_reverse
+
+        def iter_neighbours(obj):
+            yield from iter_forw(obj)
+            if iter_back:
+                yield from iter_back(obj)
+
+        iterator = Iterator(self.name, iter_object=iter_neighbours)
+        return list(iterator.iterate(start_obj, breadth_first=True, **limits))
+
+    def _gather_numbered(self, start_obj, registry):
+        """ as 'gather', with a bytearray of node numbers to mark gathered nodes """
+        number = registry.number
+        iter_objects = [self._iter_object]
+        if self.reverse_name:
+            iter_objects.append(self._iter_reverse)
+
+        gathered = [start_obj]
+        seen = bytearray(len(registry) + 1)
+        seen[number(start_obj)] = 1
+        for obj in gathered:  # gathered grows while iterating
+            for iter_object in iter_objects:
+                for next_obj in iter_object(obj):
+                    next_number = number(next_obj)
+                    if next_number >= len(seen):
+                        seen.extend(bytes(next_number + 1 - len(seen)))
+                    if not seen[next_number]:
+                        seen[next_number] = 1
+                        gathered.append(next_obj)
+        return gathered
+
+    def gather_pairs(self, start_obj):
         """
         Gather all connected pairs of nodes in a graph, going forward, and backward if reverse_name is defined.
         """
         get_id = self.get_id
 
-        forw_iterator = Iterator(self.name)
-        back_iterator = Iterator(self.reverse_name) if self.reverse_name else None
+        forw_iterator = self._iterator()
+        back_iterator = self._reverse_iterator()
 
         gathered = set()
+        queued = {get_id(start_obj)}  # nodes are queued once
         queue = deque([start_obj])
         pairs = []
 
         while len(queue):
             obj = queue.popleft()
+            obj_id = get_id(obj)
 
             for forw_obj in forw_iterator.iter_object(obj):
-                key = (get_id(obj), get_id(forw_obj))
-                if key not in gathered:
+                forw_id = get_id(forw_obj)
+                if (obj_id, forw_id) not in gathered:
+                    gathered.add((obj_id, forw_id))
                     pairs.append((obj, forw_obj))
+                if forw_id not in queued:
+                    queued.add(forw_id)
                     queue.append(forw_obj)
-                gathered.add(key)
 
             if back_iterator:
                 for back_obj in back_iterator.iter_object(obj):
-                    key = (get_id(back_obj), get_id(obj))
-                    if key not in gathered:
+                    back_id = get_id(back_obj)
+                    if (back_id, obj_id) not in gathered:
+                        gathered.add((back_id, obj_id))
                         pairs.append((back_obj, obj))
+                    if back_id not in queued:
+                        queued.add(back_id)
                         queue.append(back_obj)
-                    gathered.add(key)
         return pairs
 
-    def find(self, start_obj, filter):
-        """ return objects that pass the filer callback """
-        return [obj for obj in self.iterate(start_obj, breadth_first=True) if filter(obj)]
+    def same_component(self, obj, other):
+        """ return whether obj and other are connected through the graph, in any direction """
+        tracker = self._tracker(obj)
+        if tracker is not None:
+            return tracker.same_component(obj, other)
+        return any(node is other for node in self.gather(obj))
+
+    def component_size(self, obj):
+        """ return the number of nodes connected to obj through the graph (including obj), in any direction """
+        tracker = self._tracker(obj)
+        if tracker is not None:
+            return tracker.component_size(obj)
+        return len(self.gather(obj))
+
+    def find(self, start_obj, filter, **limits):
+        """ return objects that pass the filer callback; limits (max_depth, prune, max_nodes) as in 'iterate' """
+        return [obj for obj in self.iterate(start_obj, breadth_first=True, **limits) if filter(obj)]
+
+    def reachable(self, start_obj, target_obj, **limits):
+        """
+        return whether target_obj can be reached from start_obj through the graph; with limits (max_depth, prune,
+        max_nodes) as in 'iterate', whether it can be reached within these limits
+        """
+        if any(limit is not None for limit in limits.values()):
+            return self._reachable_limited(start_obj, target_obj, **limits)
+        if self._reach_index:
+            return self._reachability_index(start_obj).reachable(start_obj, target_obj)
+        registry = self._registry(start_obj)
+        if registry is not None:
+            return self._reachable_numbered(start_obj, target_obj, registry)
+        iter_object = self._iter_object
+        seen = {id(start_obj)}
+        stack = [start_obj]
+        while stack:
+            for next_obj in iter_object(stack.pop()):
+                if next_obj is target_obj:
+                    return True
+                if id(next_obj) not in seen:
+                    seen.add(id(next_obj))
+                    stack.append(next_obj)
+        return False
 
-    def reachable(self, start_obj, target_obj):
-        """ return whether target_obj can be reached from start_obj through the graph """
-        iterator = Iterator(self.name)
-        for obj in iterator(start_obj):
-            if target_obj in iterator.iter_object(obj):
-                return True
+    def _reachable_limited(self, start_obj, target_obj, max_depth=None, prune=None, max_nodes=None):
+        """ as 'reachable', breadth first within the limits """
+        if max_depth is not None and max_depth < 1:
+            return False
+        iter_object = self._iter_object
+        for obj in self._iterator().iterate(start_obj, breadth_first=True, prune=prune, max_nodes=max_nodes,
+                                            max_depth=None if max_depth is None else max_depth - 1):
+            if prune is not None and prune(obj):
+                continue
+            for next_obj in iter_object(obj):
+                if next_obj is target_obj:
+                    return True
         return False
 
+    def _reachable_numbered(self, start_obj, target_obj, registry):
+        """ as 'reachable', with a bytearray of node numbers to mark seen nodes """
+        number = registry.number
+        iter_object = self._iter_object
+        seen = bytearray(len(registry) + 1)
+        seen[number(start_obj)] = 1
+        stack = [start_obj]
+        while stack:
+            for next_obj in iter_object(stack.pop()):
+                if next_obj is target_obj:
+                    return True
+                next_number = number(next_obj)
+                if next_number >= len(seen):
+                    seen.extend(bytes(next_number + 1 - len(seen)))
+                if not seen[next_number]:
+                    seen[next_number] = 1
+                    stack.append(next_obj)
+        return False
+
+    def _reachability_index(self, start_obj):
+        """ the index of the part of the graph with start_obj in it, (re)built when missing or outdated """
+        index = self._cached(start_obj, 'reach_index')
+        if index is None:
+            index = ReachabilityIndex(self.gather(start_obj), self._iter_object)
+            self._cache(start_obj, index, 'reach_index', index.components)
+        return index
+
     def walk(self, start_obj, key, on_visit=None):
         """
         iterate through the graph, with a key function selecting the next connected node
@@ -276,38 +897,74 @@ class BaseLinker(object):
         :param on_visit: optional callback applied to the visited node
         :return: yield nodes encountered in the graph one-by-one
         """
-        yield from Iterator(self.name).walk(start_obj, key=key, on_visit=on_visit)
+        yield from self._iterator().walk(start_obj, key=key, on_visit=on_visit)
 
-    def endpoints(self, start_obj):
-        """ return a list of endpoint nodes (with no next node in the graph), starting from start_obj"""
+    def endpoints(self, start_obj, **limits):
+        """
+        return a list of endpoint nodes (with no next node in the graph), starting from start_obj; limits (max_depth,
+        prune, max_nodes) as in 'iterate'
+        """
         endpoints = []
-        iterator = Iterator(self.name)
-        for obj in iterator(start_obj):
+        iterator = self._iterator(start_obj)
+        for obj in iterator.iterate(start_obj, **limits):
             if not list(iterator.iter_object(obj)):
                 endpoints.append(obj)
         return endpoints
 
     def is_cyclic(self, start_obj):
         """ returns whether any cycles are in the graph reachable from start_obj"""
-        seen = set()
-        cyclic = False
+        return self._containing_condensation(start_obj).is_cyclic(start_obj)
 
-        def visit(obj):
-            nonlocal cyclic
-            obj_id = self.get_id(obj)
-            if obj_id in seen:
-                cyclic = True
-                raise StopIteration
-            seen.add(obj_id)
+    def strongly_connected_components(self, start_obj):
+        """
+        return the strongly connected components (lists of nodes that can all reach each other) of the graph reachable
+        from start_obj, in reverse topological order; the result is cached until the graph changes.
+        """
+        return self.condensation(start_obj).components
 
-        self.visit(start_obj, on_visit=visit, cyclic=True)
-        return cyclic
+    def condensation(self, start_obj):
+        """
+        return the Condensation (DAG of strongly connected components) of the graph reachable from start_obj, with e.g.
+        methods 'component(node)', 'in_cycle(node)' and 'cycles()'; the result is cached until the graph changes.
+        """
+        condensation = self._cached(start_obj, 'condensation')
+        if condensation is None:
+            condensation = Condensation([start_obj], self._iter_object)
+            self._cache(start_obj, condensation, 'condensation', [[start_obj]])
+            self._cache(start_obj, condensation, 'condensation_of', condensation.components)
+        return condensation
+
+    def _containing_condensation(self, obj):
+        """ return a cached condensation containing obj (and so all nodes reachable from obj) or create one """
+        condensation = self._cached(obj, 'condensation_of')
+        if condensation is None:
+            return self.condensation(obj)
+        return condensation
+
+    def _cached(self, obj, what):
+        """ the value cached as 'what' on obj for the current version of the graph, or None """
+        cached = obj.__dict__.get(_cache_key(self.name, what))
+        if cached is not None and cached.version == self._version(obj):
+            return cached.value
+        return None
+
+    def _cache(self, obj, value, what, components):
+        """
+        caches value (computed for obj) as 'what' on all nodes in components (lists of nodes, connected to obj); the
+        cache is kept with the nodes instead of on the linker, so it does not keep the nodes alive
+        """
+        key, cached = _cache_key(self.name, what), _Cached(self._version(obj), value)
+        for component in components:
+            for obj in component:
+                obj.__dict__[key] = cached
 
     def in_cycle(self, start_obj):
         """ return whether start_obj is in a cycle (whether it can be reached from itself)"""
-        return self.reachable(start_obj, start_obj)
+        if self._reach_index:
+            return self.reachable(start_obj, start_obj)
+        return self._containing_condensation(start_obj).in_cycle(start_obj)
 
-    def shortest_path(self, start_obj, target_obj, get_cost=None, heuristic=None):
+    def shortest_path(self, start_obj, target_obj, get_cost=None, heuristic=None, bidirectional=False):
         """
          Finds the shortest path through the graph from start_obj to target_obj
         :param start_obj: node to start from
@@ -316,11 +973,44 @@ class BaseLinker(object):
             results in a shortest path defined by the number of edges between start and end.
         :param heuristic(node, target_node): optional heuristic function to calculate an under estimate of the remaining
             cost from a node to the target node (often resulting in faster path_finding, using A*).
+        :param bidirectional: search from both start_obj and (following the reverse relationship) target_obj, usually
+            expanding far fewer nodes; the heuristic, if any, must be symmetric: heuristic(n1, n2) == heuristic(n2, n1).
         :return: list of nodes of the shortest path
         """
-        return Iterator(self.name).shortest_path(start_obj, target_obj,
-                                                 get_cost=get_cost,
-                                                 heuristic=heuristic)
+        if bidirectional and not self.reverse_name:
+            raise ValueError(f"bidirectional shortest path in '{self.name}' requires a reverse relationship")
+        if self._path_cache is None:
+            return self._iterator(start_obj).shortest_path(start_obj, target_obj,
+                                                     get_cost=get_cost,
+                                                     heuristic=heuristic,
+                                                     reverse_name=self.reverse_name if bidirectional else None)
+        if self._tracker(start_obj) is None and self._path_cache_version != self.version:
+            self._path_cache.clear()
+            self._path_cache_version = self.version
+
+        key = (id(start_obj), id(target_obj), get_cost, heuristic)
+        version = self._version(start_obj)  # also the version of target_obj, if a path can exist
+        cached = self._path_cache.get(key, valid=lambda cached: cached[3] == version)
+        if cached is None:
+            path = self._iterator(start_obj).shortest_path(start_obj, target_obj,
+                                                     get_cost=get_cost,
+                                                     heuristic=heuristic,
+                                                     reverse_name=self.reverse_name if bidirectional else None)
+            cached = (start_obj, target_obj, path, version)  # keeps start_obj and target_obj (and their ids) alive
+            self._path_cache.put(key, cached)
+        path = cached[2]
+        return None if path is None else list(path)
+
+    def cache_info(self):
+        """ return hits, misses, maxsize and current size of the shortest path cache (see 'path_cache') """
+        if self._path_cache is None:
+            return None
+        return self._path_cache.info()
+
+    def clear_cache(self):
+        """ empties the shortest path cache """
+        if self._path_cache is not None:
+            self._path_cache.clear()
 
     def shortest_paths(self, start_obj, target_objs, get_cost=None, allow_partial=False):
         """
@@ -335,10 +1025,60 @@ class BaseLinker(object):
         Note that there is no heuristic option, since the heuristic version of the algorithm has no speed advantage for
             multiple targets (you might as well run the single target version multiple times.
         """
-        return Iterator(self.name).shortest_paths(start_obj, target_objs,
+        return self._iterator().shortest_paths(start_obj, target_objs,
                                                   get_cost=get_cost,
                                                   allow_partial=allow_partial)
 
+    def shortest_path_tree(self, start_obj, get_cost=None, max_cost=None):
+        """
+         Finds the shortest paths from start_obj to all reachable nodes, in a single search
+        :param start_obj: node to start from
+        :param get_cost(node, next_node): cost function as in 'shortest_path'
+        :param max_cost: optional maximum cost of the paths; nodes further away are not settled
+        :return: ShortestPathTree object, with methods 'cost(node)', 'path(node)' and 'predecessor(node)'
+        """
+        return self._iterator().shortest_path_tree(start_obj, get_cost=get_cost, max_cost=max_cost)
+
+    def preprocess_hierarchy(self, start_obj, get_cost=None, witness_limit=64):
+        """
+         Preprocesses the graph gathered from start_obj (see 'gather') into a contraction hierarchy, to answer many
+         shortest path queries on a graph that does not change much faster.
+        :param start_obj: node in the graph
+        :param get_cost(node, next_node): cost function as in 'shortest_path'
+        :param witness_limit: see ContractionHierarchy
+        :return: ContractionHierarchy object, with methods 'shortest_path(start_obj, target_obj)' and 'cost(...)'
+        """
+        if get_cost is None:
+            def get_cost(o1, o2):
+                return 0 if o1 is o2 else 1
+        return ContractionHierarchy(self.gather(start_obj), self._iter_object, get_cost,
+                                    witness_limit=witness_limit)
+
+    def freeze(self, start_obj, get_cost=None):
+        """
+         Creates a read-only snapshot of the graph gathered from start_obj (see 'gather'), with nodes numbered and edges
+         stored in compact arrays, for fast analytics on a graph that does not change.
+        :param start_obj: node in the graph
+        :param get_cost(node, next_node): optional cost function as in 'shortest_path', to store the cost of each edge
+        :return: FrozenGraph object, with methods like 'iterate', 'gather', 'reachable' and 'shortest_path' on node numbers
+        """
+        return FrozenGraph(self.gather(start_obj), self._iter_object, get_cost)
+
+    def build_landmarks(self, start_obj, count=8, get_cost=None):
+        """
+         Precomputes an A* heuristic (see Landmarks) for the graph gathered from start_obj, for graphs without a natural
+         heuristic (like geometric distance).
+        :param start_obj: node in the graph
+        :param count: number of landmark nodes to precompute costs for
+        :param get_cost(node, next_node): cost function as in 'shortest_path'; use the same in 'shortest_path'
+        :return: Landmarks object, to be passed as 'heuristic' to 'shortest_path'
+        """
+        if get_cost is None:
+            def get_cost(o1, o2):
+                return 0 if o1 is o2 else 1
+        return Landmarks(self.gather(start_obj), self._iterator(), get_cost, count=count,
+                         reverse_iterator=self._reverse_iterator())
+
     def save_image(self, start_obj, filename, label_getter=lambda obj: obj.name,
                    view=False, fontsize='10', fontname='Arial bold', **options):
 
@@ -358,51 +1098,257 @@ class BaseLinker(object):
                          fontname=fontname,
                          **options)
 
+    def save_graph(self, start_obj, path):
+        """
+        Saves the graph gathered from start_obj (see 'gather') in a SQLite file. Saving again to the same path (or after
+        'load_graph' from it) only writes the nodes and links that changed.
+        :param start_obj: node in the graph
+        :param path: path of the SQLite file
+        :return: tuple of the number of nodes written and the number of nodes of which the links were written
+        """
+        return self._store(path).save(start_obj)
+
+    def load_graph(self, path, classes=()):
+        """
+        Loads a graph saved with 'save_graph'; nodes are created without calling __init__ and linked without checks.
+        :param path: path of the SQLite file
+        :param classes: classes of nodes that cannot be imported by name, e.g. classes defined in a function
+        :return: the node passed to the last 'save_graph' as start_obj
+        """
+        return self._store(path).load(classes)
+
+    def dump(self, start_obj, file):
+        """
+        Pickles the graph gathered from start_obj (see 'gather') to an open binary file, as a flat table of nodes and
+        arrays of links, without recursing through the graph (as pickling a long chain of One links would).
+        :param start_obj: node in the graph
+        :param file: file opened for binary writing
+        """
+        dump_graph(self, start_obj, file)
+
+    def load(self, file):
+        """
+        Unpickles a graph pickled with 'dump'; nodes are created without calling __init__ and linked without checks.
+        :param file: file opened for binary reading
+        :return: new copy of the start_obj passed to 'dump'
+        """
+        return load_graph(self, file)
+
+    def _link_table(self, obj):
+        """
+        LinkTable of the graph of obj, shared by all delegates in the graph (and its reverse) while it is unchanged; the
+        table is only kept (in the memo of the pickler or deepcopy) while the graph is being pickled or copied
+        """
+        if self._link_tables_version != self.version:
+            self._link_tables, self._link_tables_version = WeakValueDictionary(), self.version
+        table = self._link_tables.get(id(obj))
+        if table is None:
+            reverse = self._reverse(obj)
+            if reverse is not None and reverse._link_tables_version == reverse.version:
+                table = reverse._link_tables.get(id(obj))
+        if table is None:
+            names = (self.name, self.reverse_name) if self.reverse_name else (self.name,)
+            table = link_table([obj], names, BaseDelegate)  # the table adds all linked nodes
+            for node in table.nodes:
+                self._link_tables[id(node)] = table
+        return table
+
+    def _store(self, path):
+        path = os.path.abspath(path)
+        if path not in self._stores:
+            self._stores[path] = GraphStore(self, path)
+        return self._stores[path]
+
     def _reverse(self, target):
         if self.reverse_name is None:
             return None
         return getattr(target.__class__, self.reverse_name)
 
-    def _creates_cycle(self, obj, target):
-        if obj is target:
+    def _creates_cycle(self, obj, *targets):
+        """ whether linking obj to all targets creates a cycle; checked in a single (partial) traversal """
+        targets = [t for t in targets if t is not None and not self._existing(obj, t)]
+        if not targets:
+            return False
+        if any(obj is target for target in targets):
             return True
         if self.name == self.reverse_name:
             return True
-        if target is None:
-            return False
-        if self._existing(obj, target):
-            return False
-        return self.reachable(target, obj)
+        ordered = {}  # usually a single group, unless targets are of classes with different reverse relationships
+        for target in targets:
+            ordered.setdefault(self._ordered_name(target), []).append(target)
+        for name, group in ordered.items():
+            sources, targets = ([obj], group) if name == self.name else (group, [obj])
+            result = None
+            if name not in BaseLinker._unordered_names:
+                BaseLinker._ordered_names.add(name)
+                transaction = self._active_transaction(group[0])
+                saved = transaction.orders if transaction is not None else None
+                iter_object = self._iter_object if name == self.name else self._iter_reverse
+                result = _update_order(name, sources, targets, saved, iter_object)
+            if result is None:  # the order cannot be used (anymore): search the graph
+                BaseLinker._unordered_names.add(name)
+                if _reaches(name, targets, sources):
+                    return True
+            elif not result:
+                return True
+        return False
 
-    def _check(self, obj, target):
-        if target is None:
+    def _mark_unordered(self, obj, targets):
+        """
+        called when obj is linked to targets without keeping a topological order: if these nodes have an order, the
+        order of the graph cannot be used anymore to check for cycles (the graph is searched instead)
+        """
+        for name in (self.name, self.reverse_name):
+            if name in BaseLinker._ordered_names and name not in BaseLinker._unordered_names:
+                key = _order_key(name)
+                if key in obj.__dict__ or any(key in target.__dict__ for target in targets):
+                    BaseLinker._unordered_names.add(name)
+
+    def _order_nodes(self, nodes):
+        """
+        gives nodes that were linked without checks (e.g. loaded) a topological order, if one is kept for the graph;
+        nodes must contain all nodes they are linked to, and must not have been ordered before
+        """
+        nodes = list(nodes)
+        if not nodes:
             return
+        reverse = self._reverse(nodes[0])
+        if self.cyclic and (not reverse or reverse.cyclic):
+            return
+        name = self._ordered_name(nodes[0])
+        key, iter_object = _order_key(name), Iterator(name).iter_object
+        order, done = len(nodes), set()
+        for node in nodes:  # reverse post-order of a depth first search is a topological order
+            if id(node) in done:
+                continue
+            done.add(id(node))
+            stack = [(node, iter_object(node))]
+            while stack:
+                obj, next_objs = stack[-1]
+                for next_obj in next_objs:
+                    if id(next_obj) not in done:
+                        done.add(id(next_obj))
+                        stack.append((next_obj, iter_object(next_obj)))
+                        break
+                else:
+                    stack.pop()
+                    order -= 1
+                    obj.__dict__[key] = order
+        BaseLinker._ordered_names.add(name)
+
+    def _ordered_name(self, target):
+        """ name of the acyclic direction of the graph in which the topological order is maintained """
+        names = [] if self.cyclic else [self.name]
         reverse = self._reverse(target)
-        if not (self.to_self and (not reverse or reverse.to_self)):  # reverse might be a different relationship
-            if obj is target:
-                raise ValueError(f"pointing '{self.name}' in {obj.__class__.__name__} back to self: 'to_self' is set to False")
-        if not (self.cyclic and (not reverse or reverse.cyclic)):
-            if self._creates_cycle(obj, target):
-                raise ValueError(f"setting '{self.name}' in {obj.__class__.__name__} creates cycle: 'cyclic' is set to False")
+        if reverse and not reverse.cyclic:
+            names.append(self.reverse_name)
+        return min(names)
+
+    def _check(self, obj, *targets):
+        """ validates the links from obj to all targets before any of them is made """
+        acyclic_targets = []
+        for target in targets:
+            if target is None:
+                continue
+            reverse = self._reverse(target)
+            if not (self.to_self and (not reverse or reverse.to_self)):  # reverse might be a different relationship
+                if obj is target:
+                    raise ValueError(f"pointing '{self.name}' in {obj.__class__.__name__} back to self: 'to_self' is set to False")
+            if not (self.cyclic and (not reverse or reverse.cyclic)):
+                acyclic_targets.append(target)
+            elif BaseLinker._ordered_names:
+                self._mark_unordered(obj, [target])
+        if acyclic_targets and self._creates_cycle(obj, *acyclic_targets):
+            raise ValueError(f"setting '{self.name}' in {obj.__class__.__name__} creates cycle: 'cyclic' is set to False")
+
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager to make a number of changes to the graph atomically, e.g.:
+
+            with Node.nexts.transaction():
+                ...  # link and unlink nodes
+
+        If an exception is raised within the with-block, all changes made via this linker (or a linker that has this
+        linker as reverse) are rolled back and no callbacks are called. Otherwise on_link and on_unlink are called
+        on exit of the with-block, for the net changes only. Nested transactions are part of the outer transaction.
+        """
+        if self._transaction is not None:
+            yield self._transaction
+            return
+        self._transaction = transaction = Transaction()
+        try:
+            yield transaction
+        except BaseException:
+            transaction.rollback()
+            raise
+        finally:
+            self._transaction = None
+        transaction.commit()
+
+    def _active_transaction(self, target):
+        if self._transaction is not None:
+            return self._transaction
+        if self.reverse_name:
+            return self._reverse(target)._transaction
+        return None
+
+    def _changed(self):
+        versions = BaseLinker._versions
+        versions[self.name] = versions.get(self.name, 0) + 1
+        if self.reverse_name and self.reverse_name != self.name:
+            versions[self.reverse_name] = versions.get(self.reverse_name, 0) + 1
 
     def _link(self, obj, target):
+        self._changed()
+        transaction = self._active_transaction(target)
+        if transaction is not None:
+            transaction.save(self, obj)
+            if self.reverse_name:
+                transaction.save(self._reverse(target), target)
         self._set(obj, target)
         if self.reverse_name:
             self._reverse(target)._set(target, obj)
+        registry = self._registry(target)
+        if registry is not None:
+            registry.number(obj)
+            registry.number(target)
+        tracker = self._tracker(target)
+        if tracker is not None:
+            tracker.link(obj, target)
 
     def _unlink(self, obj, target=None):
         if target is not None:
+            self._changed()
+            transaction = self._active_transaction(target)
+            if transaction is not None:
+                transaction.save(self, obj)
+                if self.reverse_name:
+                    transaction.save(self._reverse(target), target)
             if self.reverse_name:
                 self._reverse(target)._del(target, obj)
             self._del(obj, target)
-
-    def _on_link(self, obj, target, _remote=False):
+            tracker = self._tracker(target)
+            if tracker is not None:
+                tracker.unlink(obj, target)
+
+    def _on_link(self, obj, target, _remote=False, _deferred=False):
+        if not (_remote or _deferred):
+            transaction = self._active_transaction(target)
+            if transaction is not None:
+                transaction.record('link', self, obj, target)
+                return
         if self._do_on_link:
             self._do_on_link(obj, target)
         if self.reverse_name and not _remote:
             self._reverse(target)._on_link(target, obj, True)
 
-    def _on_unlink(self, obj, target, _remote=False):
+    def _on_unlink(self, obj, target, _remote=False, _deferred=False):
+        if not (_remote or _deferred):
+            transaction = self._active_transaction(target)
+            if transaction is not None:
+                transaction.record('unlink', self, obj, target)
+                return
         if self._do_on_unlink:
             self._do_on_unlink(obj, target)
         if self.reverse_name and not _remote:
@@ -420,9 +1366,32 @@ class BaseLinker(object):
     def _existing(self, obj, target):
         raise NotImplementedError
 
+    def _save(self, obj):
+        raise NotImplementedError
+
+    def _restore(self, obj, saved):
+        raise NotImplementedError
+
     def _build_on_visit(self, key, _reg):
+        """ returns function that finds and links the next nodes of a node, while building the graph """
+        call_key, link_targets = self._build_functions(key, _reg)
+
+        def visit(obj):
+            link_targets(obj, call_key(obj))
+
+        return visit
+
+    def _build_functions(self, key, _reg):
+        """
+        returns functions 'call_key(obj)', calling key (safe to call concurrently) and 'link_targets(obj, targets)',
+        linking the targets (de-duplicated in _reg)
+        """
         raise NotImplementedError
 
+    def _collect_targets(self, targets):
+        """ materializes the result of key (e.g. a generator), so key can run apart from linking """
+        return targets
+
 
 class One(BaseLinker):
 
@@ -443,14 +1412,15 @@ class One(BaseLinker):
     def _existing(self, obj, target):
         return target is not None and self.__get__(obj) is target
 
-    def _build_on_visit(self, key, _reg):
+    def _build_functions(self, key, _reg):
         get_id = self.get_id
 
-        def visit(obj):
+        def call_key(obj):
             if isinstance(key, str):
-                target = getattr(obj, key)
-            else:
-                target = key(obj)
+                return getattr(obj, key)
+            return key(obj)
+
+        def link_targets(obj, target):
             id_ = get_id(target)
             if id_ in _reg:  # already added to graph
                 target = _reg[id_]
@@ -458,7 +1428,7 @@ class One(BaseLinker):
                 _reg[id_] = target
             setattr(obj, self.name, target)
 
-        return visit
+        return call_key, link_targets
 
     def _init(self, obj):
         obj.__dict__[self.name] = None
@@ -469,6 +1439,12 @@ class One(BaseLinker):
     def _del(self, obj, target):
         obj.__dict__[self.name] = None
 
+    def _save(self, obj):
+        return self.__get__(obj)
+
+    def _restore(self, obj, saved):
+        obj.__dict__[self.name] = saved
+
     def _unlink(self, obj, target=None):
         if target is None:
             target = self.__get__(obj)
@@ -477,22 +1453,45 @@ class One(BaseLinker):
 
 class BaseMany(BaseLinker):
     many_class = None
+    lazy_class = None  # used with a loader
+
+    def __init__(self, *args, loader=None, max_loaded=None, **kwargs):
+        """
+        :param loader(obj): optional function returning the next nodes of obj; the links of obj are then loaded on first
+            access (e.g. from a database), so only the part of the graph that is used is loaded
+        :param max_loaded: optional maximum number of nodes with loaded links; the links of the least recently used
+            nodes are dropped and loaded again when needed (links that were changed are kept)
+        other arguments: see BaseLinker
+        """
+        super().__init__(*args, **kwargs)
+        if max_loaded and not loader:
+            raise ValueError("'max_loaded' needs a 'loader' to load dropped links again")
+        if loader and self._track_components:
+            raise ValueError("'track_components' cannot be used with a 'loader': links are not all linked up front")
+        self._loader = loader
+        self._loaded = LRUCache(max_loaded) if max_loaded else None  # delegates with loaded, unchanged links
 
     def __set__(self, obj, targets):
-        self.__get__(obj).clear()
-        self.__get__(obj).include(*targets)
+        """ replaces all targets; the new links are validated together, before the old ones are removed """
+        delegate = self.__get__(obj)
+        targets = delegate._unique_targets(targets)
+        self._check(obj, *targets)
+        delegate.clear()
+        delegate._include(targets)
 
     def __delete__(self, obj):
         self.__get__(obj).clear()
 
-    def _build_on_visit(self, key, _reg):
+    def _build_functions(self, key, _reg):
         name = self.name
         get_id = self.get_id
 
-        def visit(obj, key=key):
-            if isinstance(key, str):
-                key = getattr(obj.__class__, key)
-            for target in key(obj):
+        def call_key(obj):
+            func = getattr(obj.__class__, key) if isinstance(key, str) else key
+            return func(obj)
+
+        def link_targets(obj, targets):
+            for target in targets:
                 id_ = get_id(target)
                 if id_ in _reg:
                     target = _reg[id_]
@@ -500,21 +1499,82 @@ class BaseMany(BaseLinker):
                     _reg[id_] = target
                 getattr(obj, name).include(target)
 
-        return visit
+        return call_key, link_targets
+
+    def _collect_targets(self, targets):
+        return list(targets)
 
     def _init(self, obj):
-        obj.__dict__[self.name] = self.many_class(obj, linker=self)
+        obj.__dict__[self.name] = self._new_delegate(obj)
         return obj.__dict__[self.name]
 
+    def _new_delegate(self, obj):
+        many_class = self.many_class if self._loader is None else self.lazy_class
+        return many_class(obj, linker=self)
+
+    def _load(self, delegate):
+        """
+        loads the targets of a LazyDelegate with the loader; without callbacks, they are already linked. In an acyclic
+        graph, the loaded links are checked against the links loaded (or made) before.
+        """
+        get_id, owner = self.get_id, delegate.owner
+        targets = {get_id(target): target for target in self._loader(owner)}
+        if targets:
+            reverse = self._reverse(next(iter(targets.values())))
+            if not (self.cyclic and (not reverse or reverse.cyclic)) and self._closes_cycle(owner, targets.values()):
+                raise ValueError(f"loaded '{self.name}' of {owner.__class__.__name__} create cycle: 'cyclic' is set to False")
+            if BaseLinker._ordered_names:
+                self._mark_unordered(owner, targets.values())
+        if self._loaded is not None:
+            evicted = self._loaded.put(id(delegate), delegate)
+            if evicted is not None:
+                evicted[1].targets = None  # loaded again on next access
+        return targets
+
+    def _closes_cycle(self, owner, targets):
+        """ whether owner can be reached from targets, only following loaded links (others are checked when loaded) """
+        name, iter_object, seen = self.name, self._iter_object, set()
+        stack = list(targets)
+        while stack:
+            obj = stack.pop()
+            if obj is owner:
+                return True
+            if id(obj) not in seen:
+                seen.add(id(obj))
+                delegate = obj.__dict__.get(name)
+                if isinstance(delegate, LazyDelegate):
+                    stack.extend((delegate._targets or {}).values())
+                elif delegate is not None:
+                    stack.extend(iter_object(obj))
+        return False
+
+    def _touch(self, delegate):
+        if self._loaded is not None:
+            self._loaded.touch(id(delegate))
+
+    def _pin(self, delegate):
+        """ changed targets cannot be loaded again, so the delegate is not evicted anymore """
+        if self._loaded is not None:
+            self._loaded.pop(id(delegate))
+
     def _set(self, obj, target):
         self.__get__(obj)._set(target)
 
     def _del(self, obj, target):
         self.__get__(obj)._del(target)
 
+    def _save(self, obj):
+        return dict(self.__get__(obj).targets)
+
+    def _restore(self, obj, saved):
+        targets = self.__get__(obj).targets
+        targets.clear()
+        targets.update(saved)
+
 
 class Many(BaseMany):
     many_class = DelegateSet
+    lazy_class = LazyDelegateSet
 
     def _existing(self, obj, target):
         return target in self.__get__(obj)
@@ -522,6 +1582,7 @@ class Many(BaseMany):
 
 class ManyMap(BaseMany):
     many_class = DelegateMap
+    lazy_class = LazyDelegateMap
 
     def __init__(self, *args, key='name', **kwargs):
         super().__init__(*args, **kwargs, get_id=attrgetter(key))
@@ -0,0 +1,108 @@
+from array import array
+
+from anygraph.store import state_function, link_nodes, NodePickler, NodeUnpickler
+
+
+class LinkTable(object):
+    """
+    The links of all Many(Map) delegates in a graph, in a flat table, to pickle (or deep-copy) delegates with: pickling
+    the targets with each delegate would recurse from node to node, hitting the recursion limit on long chains and deep
+    trees. All delegates in the graph share the table, so it is pickled once: the nodes as a flat list and, per graph
+    name, the links as arrays of node numbers (with the keys of the targets, unless these are their id()).
+    """
+
+    def __init__(self, nodes, links):
+        """
+        :param nodes: list of all nodes in the graph
+        :param links: dict of graph name -> (offsets, indices, keys): the targets of the delegate of node i are the
+            nodes with numbers indices[offsets[i]:offsets[i + 1]], with these keys (None for id()); offsets can be
+            shorter than the number of nodes, for nodes without delegate
+        """
+        self.nodes = nodes
+        self.links = links
+        self.index = None  # id(node) -> node number
+
+    def __getstate__(self):
+        return {'nodes': self.nodes, 'links': self.links}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.index = None
+        for delegate in self.__dict__.pop('_waiting', ()):
+            self.restore(delegate)
+
+    def restore(self, delegate):
+        """ sets the targets of an unpickled delegate; while the table itself is unpickled, when it is complete """
+        if 'links' not in self.__dict__:
+            self.__dict__.setdefault('_waiting', []).append(delegate)
+            return
+        if self.index is None:
+            self.index = {id(node): i for i, node in enumerate(self.nodes)}
+        i = self.index[id(delegate.owner)]
+        offsets, indices, keys = self.links[delegate.linker.name]
+        nodes, targets = self.nodes, {}
+        if i + 1 < len(offsets):
+            for position in range(offsets[i], offsets[i + 1]):
+                target, key = nodes[indices[position]], keys[position]
+                targets[id(target) if key is None else key] = target
+        delegate.targets = targets
+
+
+def link_table(nodes, names, delegate_class):
+    """
+    Creates the LinkTable for the delegates of graphs 'names' in nodes and all nodes linked from these (in a single
+    breadth first pass).
+    """
+    nodes = list(nodes)
+    index = {id(node): i for i, node in enumerate(nodes)}
+    links = {name: (array('l', [0]), array('l'), []) for name in names}
+    for node in nodes:  # nodes can grow while iterating
+        node_dict = node.__dict__
+        for name, (offsets, indices, keys) in links.items():
+            delegate = node_dict.get(name)
+            if isinstance(delegate, delegate_class):
+                use_id = delegate.get_id is id
+                for key, target in delegate.targets.items():
+                    j = index.get(id(target))
+                    if j is None:
+                        j = index[id(target)] = len(nodes)
+                        nodes.append(target)
+                    indices.append(j)
+                    keys.append(None if use_id else key)
+            offsets.append(len(indices))
+    return LinkTable(nodes, links)
+
+
+def dump_graph(linker, start_obj, file):
+    """
+    Pickles the graph gathered from start_obj in three parts: the classes of the nodes, a flat table with the other
+    attributes of the nodes (with references to nodes as node numbers) and the links as arrays of node numbers. No
+    part recurses through the graph.
+    """
+    nodes = linker.gather(start_obj)
+    index = {id(node): i for i, node in enumerate(nodes)}
+    get_state, iter_object = state_function(linker), linker._iter_object
+    offsets, indices = array('l', [0]), array('l')
+    for node in nodes:
+        indices.extend(index[id(target)] for target in iter_object(node))
+        offsets.append(len(indices))
+    pickler = NodePickler(file, index)
+    pickler.dump((linker.name, [node.__class__ for node in nodes]))
+    pickler.dump([get_state(node) for node in nodes])
+    pickler.dump((offsets, indices, index[id(start_obj)]))
+
+
+def load_graph(linker, file):
+    """ unpickles a graph pickled with dump_graph; see BaseLinker.load """
+    nodes = []
+    unpickler = NodeUnpickler(file, nodes)
+    name, classes = unpickler.load()
+    if name != linker.name:
+        raise ValueError(f"graph '{name}' cannot be loaded in graph '{linker.name}'")
+    nodes.extend(cls.__new__(cls) for cls in classes)
+    for node, state in zip(nodes, unpickler.load()):
+        node.__dict__.update(state)
+    offsets, indices, start = unpickler.load()
+    link_nodes(linker, nodes, {i: indices[offsets[i]:offsets[i + 1]]
+                               for i in range(len(nodes)) if offsets[i] < offsets[i + 1]})
+    return nodes[start]
@@ -0,0 +1,207 @@
+import random
+
+
+def strongly_connected_components(nodes, iter_object):
+    """
+    Iterative version of Tarjan's algorithm (no recursion limits), finding the strongly connected components of the
+    graph through 'nodes', in O(V + E).
+    :param nodes: nodes to start from (nodes reachable from these are included)
+    :param iter_object: function returning the next nodes of a node
+    :return: list of components (lists of nodes), in reverse topological order: edges between components only
+        point from components later in the list to components earlier in the list.
+    """
+    index = {}  # id(node) -> order of discovery
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+    for root in nodes:
+        if id(root) in index:
+            continue
+        index[id(root)] = lowlink[id(root)] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(id(root))
+        work = [(root, iter(iter_object(root)))]
+        while work:
+            obj, next_objs = work[-1]
+            obj_id = id(obj)
+            for next_obj in next_objs:
+                next_id = id(next_obj)
+                if next_id not in index:
+                    index[next_id] = lowlink[next_id] = counter
+                    counter += 1
+                    stack.append(next_obj)
+                    on_stack.add(next_id)
+                    work.append((next_obj, iter(iter_object(next_obj))))
+                    break
+                elif next_id in on_stack:
+                    lowlink[obj_id] = min(lowlink[obj_id], index[next_id])
+            else:
+                work.pop()
+                if work:
+                    parent_id = id(work[-1][0])
+                    lowlink[parent_id] = min(lowlink[parent_id], lowlink[obj_id])
+                if lowlink[obj_id] == index[obj_id]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(id(member))
+                        component.append(member)
+                        if member is obj:
+                            break
+                    components.append(component)
+    return components
+
+
+class Condensation(object):
+    """
+    The condensation of a graph: the DAG of its strongly connected components (in reverse topological order, see
+    'strongly_connected_components'). Components are referred to by their position in 'components'.
+    """
+
+    def __init__(self, nodes, iter_object):
+        self.components = strongly_connected_components(nodes, iter_object)
+        self.component_of = {}  # id(node) -> position of component
+        for position, component in enumerate(self.components):
+            for node in component:
+                self.component_of[id(node)] = position
+
+        count = len(self.components)
+        self.successors = [set() for _ in range(count)]
+        self.cyclic = [len(component) > 1 for component in self.components]
+        for position, component in enumerate(self.components):
+            for node in component:
+                for next_node in iter_object(node):
+                    next_position = self.component_of[id(next_node)]
+                    if next_position != position:
+                        self.successors[position].add(next_position)
+                    elif next_node is node:
+                        self.cyclic[position] = True
+        self.successors = [tuple(successors) for successors in self.successors]
+
+    def __len__(self):
+        return len(self.components)
+
+    def __contains__(self, obj):
+        return id(obj) in self.component_of
+
+    def component(self, obj):
+        """ return the strongly connected component (list of nodes) obj is in """
+        return self.components[self.component_of[id(obj)]]
+
+    def in_cycle(self, obj):
+        """ return whether obj can be reached from itself """
+        return self.cyclic[self.component_of[id(obj)]]
+
+    def is_cyclic(self, start_obj):
+        """ return whether there are any cycles reachable from start_obj """
+        start = self.component_of[id(start_obj)]
+        seen = {start}
+        stack = [start]
+        while stack:
+            position = stack.pop()
+            if self.cyclic[position]:
+                return True
+            for next_position in self.successors[position]:
+                if next_position not in seen:
+                    seen.add(next_position)
+                    stack.append(next_position)
+        return False
+
+    def cycles(self):
+        """ return the components that contain cycles """
+        return [component for component, cyclic in zip(self.components, self.cyclic) if cyclic]
+
+
+class ReachabilityIndex(Condensation):
+    """
+    Index to answer 'can node b be reached from node a' in (nearly) constant time. The graph is condensed into a DAG
+    of strongly connected components, which are labeled with:
+
+     - their position in the reverse topological order: edges only point to components with a lower position,
+     - intervals of a number of randomized depth-first traversals (GRAIL): if b is reachable from a, the interval of
+       b lies within the interval of a,
+     - intervals of a depth-first spanning tree: if the interval of b lies within that of a, b is reachable from a.
+
+    Only if none of these decide, a depth-first search is done, pruned with the same labels. The index does not follow
+    changes in the graph.
+    """
+
+    def __init__(self, nodes, iter_object, traversals=2, seed=0):
+        super().__init__(nodes, iter_object)
+        rand = random.Random(seed)
+        self.tree_intervals = self._label(shuffle=None, tree=True)
+        self.intervals = [self._label(shuffle=rand.shuffle) for _ in range(traversals)]
+
+    def _label(self, shuffle=None, tree=False):
+        """
+        Labels all components with intervals in a post-order traversal of the condensation DAG. For the spanning tree
+        the interval is (pre-order rank, post-order rank), otherwise (lowest rank of all descendants, post-order rank).
+        """
+        count = len(self.components)
+        roots = list(range(count - 1, -1, -1))  # upstream components first
+        if shuffle:
+            shuffle(roots)
+        lows, posts = [None] * count, [None] * count
+        rank = 0
+        for root in roots:
+            if posts[root] is not None or lows[root] is not None:
+                continue
+            lows[root] = rank
+            work = [(root, self._children(root, shuffle))]
+            while work:
+                position, children = work[-1]
+                for child in children:
+                    if lows[child] is None:  # not yet visited
+                        lows[child] = rank
+                        work.append((child, self._children(child, shuffle)))
+                        break
+                else:
+                    work.pop()
+                    posts[position] = rank
+                    if not tree:
+                        lows[position] = min([rank] + [lows[c] for c in self.successors[position]])
+                    rank += 1
+        return lows, posts
+
+    def _children(self, position, shuffle):
+        children = self.successors[position]
+        if shuffle and len(children) > 1:
+            children = list(children)
+            shuffle(children)
+        return iter(children)
+
+    def _maybe_reachable(self, source, target):
+        """ False if target is certainly not reachable from source """
+        if source < target:
+            return False
+        for lows, posts in self.intervals:
+            if lows[target] < lows[source] or posts[target] > posts[source]:
+                return False
+        return True
+
+    def reachable(self, start_obj, target_obj):
+        """ return whether target_obj can be reached from start_obj (through at least one edge) """
+        source, target = self.component_of.get(id(start_obj)), self.component_of.get(id(target_obj))
+        if source is None or target is None:
+            return False
+        if source == target:
+            return self.cyclic[source] if start_obj is target_obj else True
+        if not self._maybe_reachable(source, target):
+            return False
+        lows, posts = self.tree_intervals
+        if lows[source] <= lows[target] and posts[target] <= posts[source]:
+            return True
+
+        seen = {source}
+        stack = [source]
+        while stack:
+            for position in self.successors[stack.pop()]:
+                if position == target:
+                    return True
+                if position not in seen and self._maybe_reachable(position, target):
+                    seen.add(position)
+                    stack.append(position)
+        return False
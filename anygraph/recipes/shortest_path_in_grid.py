@@ -104,11 +104,6 @@ def print_grid(nodes_dict, path=None):
     print('\n')
 
 
-""" lets run: create nodes and connect """
-size = 20
-nodes_dict = create_nodes_dict(size)
-connect_nodes(nodes_dict)
-
 """ using the sum metric (manhattan distance) based on location in the grid as weights for edges """
 def manhattan_distance(node1, node2):
     i1, j1 = node1.index
@@ -122,47 +117,52 @@ def euclidean_distance(node1, node2):
     return math.sqrt((i1 - i2)*(i1 - i2) + (j1 - j2)*(j1 - j2))
 
 
-""" lets pick a start and end node for the path in opposite corners"""
-start_node, end_node = nodes_dict[0, 0], nodes_dict[size - 1, size - 1]
+if __name__ == '__main__':
+    """ lets run: create nodes and connect """
+    size = 20
+    nodes_dict = create_nodes_dict(size)
+    connect_nodes(nodes_dict)
 
-""" when no heuristic function is available (an under-estimate from any node to the endpoint) dijkstra is used """
-path1 = Node.adjacent.shortest_path(start_node, end_node,
-                                    get_cost=manhattan_distance)
-print('path (dijkstra, manhattan) =', [p.index for p in path1], 'length = ', len(path1))
+    """ lets pick a start and end node for the path in opposite corners"""
+    start_node, end_node = nodes_dict[0, 0], nodes_dict[size - 1, size - 1]
 
-""" otherwise astar (faster) is used. note that the heuristic function calculates the sum distance for non-connected nodes """
-path2 = Node.adjacent.shortest_path(start_node, end_node,
-                                    get_cost=manhattan_distance,
-                                    heuristic=manhattan_distance)
-print('path (astar, manhattan)    =', [p.index for p in path2], 'length = ', len(path2))
+    """ when no heuristic function is available (an under-estimate from any node to the endpoint) dijkstra is used """
+    path1 = Node.adjacent.shortest_path(start_node, end_node,
+                                        get_cost=manhattan_distance)
+    print('path (dijkstra, manhattan) =', [p.index for p in path1], 'length = ', len(path1))
 
-""" these paths will (should ;-) always have the same length (astar is just faster in case direct routes are blocked)! """
-print(f"\ndijkstra found a path of length {len(path1)}; astar found a path of length {len(path2)}\n")
+    """ otherwise astar (faster) is used. note that the heuristic function calculates the sum distance for non-connected nodes """
+    path2 = Node.adjacent.shortest_path(start_node, end_node,
+                                        get_cost=manhattan_distance,
+                                        heuristic=manhattan_distance)
+    print('path (astar, manhattan)    =', [p.index for p in path2], 'length = ', len(path2))
 
-""" and show the paths in the grid """
-print('dijkstra, manhattan:\n')
-print_grid(nodes_dict, path1)
+    """ these paths will (should ;-) always have the same length (astar is just faster in case direct routes are blocked)! """
+    print(f"\ndijkstra found a path of length {len(path1)}; astar found a path of length {len(path2)}\n")
 
-print('astar, manhattan:\n')
-print_grid(nodes_dict, path2)
+    """ and show the paths in the grid """
+    print('dijkstra, manhattan:\n')
+    print_grid(nodes_dict, path1)
 
-""" and do the same thing, only whle using the euclidian distance """
-path1 = Node.adjacent.shortest_path(start_node, end_node,
-                                    get_cost=euclidean_distance)
-print('path (dijkstra, euclidean) =', [p.index for p in path1], 'length = ', len(path1))
+    print('astar, manhattan:\n')
+    print_grid(nodes_dict, path2)
 
-""" compare to A* """
-path2 = Node.adjacent.shortest_path(start_node, end_node,
-                                    get_cost=euclidean_distance,
-                                    heuristic=euclidean_distance)
-print('path (astar, euclidean)    =', [p.index for p in path2], 'length = ', len(path2))
+    """ and do the same thing, only whle using the euclidian distance """
+    path1 = Node.adjacent.shortest_path(start_node, end_node,
+                                        get_cost=euclidean_distance)
+    print('path (dijkstra, euclidean) =', [p.index for p in path1], 'length = ', len(path1))
 
-print(f"\ndijkstra found a path of length {len(path1)}; astar found a path of length {len(path2)}\n")
+    """ compare to A* """
+    path2 = Node.adjacent.shortest_path(start_node, end_node,
+                                        get_cost=euclidean_distance,
+                                        heuristic=euclidean_distance)
+    print('path (astar, euclidean)    =', [p.index for p in path2], 'length = ', len(path2))
 
-""" and show the paths in the grid again """
-print('dijkstra, euclidean:\n')
-print_grid(nodes_dict, path1)
+    print(f"\ndijkstra found a path of length {len(path1)}; astar found a path of length {len(path2)}\n")
 
-print('astar, euclidean:\n')
-print_grid(nodes_dict, path2)
+    """ and show the paths in the grid again """
+    print('dijkstra, euclidean:\n')
+    print_grid(nodes_dict, path1)
 
+    print('astar, euclidean:\n')
+    print_grid(nodes_dict, path2)
@@ -0,0 +1,38 @@
+from itertools import count
+
+
+class _Number(int):
+    """ node number that unpickles (and copies) as None, so copies of a node do not share its number """
+    __slots__ = ()
+
+    def __reduce__(self):
+        return type(None), ()
+
+
+class NodeRegistry(object):
+    """
+    Numbers nodes densely (0, 1, 2, ...) in the order they are first linked, so algorithms can use bytearrays and lists
+    indexed by node number instead of sets and dicts keyed by id(node). Like the topological order, the number is
+    stored on the node itself (in obj.__dict__), but it is not pickled or copied with the node: a copy gets its own
+    number when it is first used. Numbers are never reused, so the size of these arrays is the number of nodes ever
+    linked in the graph.
+    """
+
+    _keys = count()  # registries for graphs with the same name (in different classes) store numbers separately
+
+    def __init__(self, name):
+        self.key = f'_{name}_number_{next(self._keys)}'
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def number(self, obj):
+        """ return the number of obj, assigning the next free number if obj has none yet """
+        obj_dict = obj.__dict__
+        number = obj_dict.get(self.key)
+        if number is None:
+            number = obj_dict[self.key] = _Number(self.count)
+            self.count += 1
+        return number
+
@@ -0,0 +1,246 @@
+import io
+import pickle
+import sqlite3
+from hashlib import blake2b
+from importlib import import_module
+from weakref import WeakValueDictionary
+
+_schema = """
+CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value);
+CREATE TABLE IF NOT EXISTS nodes (id INTEGER PRIMARY KEY, class TEXT NOT NULL, state BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS edges (source INTEGER NOT NULL, position INTEGER NOT NULL, target INTEGER NOT NULL,
+                                  PRIMARY KEY (source, position)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS edges_target ON edges (target);
+"""
+
+
+def _class_name(cls):
+    return f'{cls.__module__}:{cls.__qualname__}'
+
+
+def state_function(linker):
+    """
+    returns function returning the attributes of a node to save: without links, topological order, node numbers and
+    cached values of the graph
+    """
+    names = {name for name in (linker.name, linker.reverse_name) if name}
+    excluded = names | {f'_{name}_order' for name in names}
+    prefixes = tuple(f'_{name}_{what}_' for name in names for what in ('number', 'cached'))
+
+    def get_state(node):
+        return {k: v for k, v in node.__dict__.items() if k not in excluded and not k.startswith(prefixes)}
+
+    return get_state
+
+
+class NodePickler(pickle.Pickler):
+    """ pickles references to the nodes of a graph by node number, instead of copies of the nodes """
+
+    def __init__(self, file, index):
+        """
+        :param index: dict of id(node) -> node number
+        """
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.index = index
+
+    def persistent_id(self, obj):
+        return self.index.get(id(obj))
+
+
+class NodeUnpickler(pickle.Unpickler):
+    """ unpickles references pickled by NodePickler """
+
+    def __init__(self, file, nodes):
+        """
+        :param nodes: list or dict of nodes by number
+        """
+        super().__init__(file)
+        self.nodes = nodes
+
+    def persistent_load(self, number):
+        return self.nodes[number]
+
+
+def link_nodes(linker, nodes, edges):
+    """
+    Links loaded nodes in both directions; the graph was valid when saved, so links are not checked (and no callbacks
+    are called). In acyclic graphs the nodes are given a topological order.
+    :param nodes: list or dict of nodes by number
+    :param edges: dict of node number -> sequence of the numbers of the next nodes
+    """
+    name, reverse_name = linker.name, linker.reverse_name
+    linkers = {}  # class -> (linker, reverse linker, node registry, component tracker) for nodes of the class
+
+    def get_linkers(node):
+        cls = node.__class__
+        if cls not in linkers:
+            linkers[cls] = (getattr(cls, name, None), getattr(cls, reverse_name) if reverse_name else None,
+                            linker._registry(node), linker._tracker(node))
+        return linkers[cls]
+
+    for row, target_rows in edges.items():
+        source = nodes[row]
+        source_linker = get_linkers(source)[0]
+        for target_row in target_rows:
+            target = nodes[target_row]
+            _, reverse, registry, tracker = get_linkers(target)
+            source_linker._set(source, target)
+            if reverse is not None:
+                reverse._set(target, source)
+            if registry is not None:
+                registry.number(source)
+                registry.number(target)
+            if tracker is not None:
+                tracker.link(source, target)
+    linker._order_nodes(nodes.values() if isinstance(nodes, dict) else nodes)
+    linker._changed()
+
+
+class GraphStore(object):
+    """
+    SQLite file with the nodes and links of a graph: a table with a row per node (its class and its other attributes,
+    pickled, with references to saved nodes pickled as their row id) and an indexed table with a row per link. Only the
+    links of the graph itself are stored; links of the reverse relationship are restored from them on load.
+
+    The store remembers what it saved (or loaded), so a next save only writes the nodes and links that changed. It
+    keeps weak references to these nodes, so it does not keep a graph alive; nodes must support weak references.
+    """
+
+    def __init__(self, linker, path):
+        self.linker = linker
+        self.path = path
+        self.rows = {}  # id(node) -> row id
+        self.ids = {}  # row id -> id(node)
+        self.nodes = WeakValueDictionary()  # row id -> node, while the node exists
+        self.states = {}  # row id -> digest of saved state
+        self.edges = {}  # row id -> tuple of target row ids
+        self.version = None  # version of the graph when last saved or loaded
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.executescript(_schema)
+        return connection
+
+    def save(self, start_obj):
+        """ saves all nodes connected to start_obj (see 'gather'), writing only what changed since the last save """
+        linker = self.linker
+        nodes = linker.gather(start_obj)
+        rows, ids, saved_nodes, states = self.rows, self.ids, self.nodes, self.states
+        next_row = max(ids, default=-1) + 1
+        index = {}  # id(node) -> row id of the current nodes; all rows are needed before pickling references
+        for node in nodes:
+            row = rows.get(id(node))
+            if row is None or saved_nodes.get(row) is not node:  # new node, possibly with the id() of a deleted one
+                row = rows[id(node)] = next_row
+                ids[row], saved_nodes[row] = id(node), node
+                next_row += 1
+            index[id(node)] = row
+
+        node_rows = []  # rows to insert or replace
+        get_state = state_function(linker)
+        buffer = io.BytesIO()
+        pickler = NodePickler(buffer, index)
+        for node in nodes:
+            buffer.seek(0)
+            buffer.truncate()
+            pickler.clear_memo()
+            pickler.dump(get_state(node))
+            state = buffer.getvalue()
+            digest = blake2b(state, digest_size=16).digest()
+            row = index[id(node)]
+            if states.get(row) == digest:
+                continue
+            states[row] = digest
+            node_rows.append((row, _class_name(node.__class__), state))
+
+        current = set(index.values())
+        removed = [row for row in ids if row not in current]  # including rows of deleted nodes
+        for row in removed:
+            node_id = ids.pop(row)
+            if rows.get(node_id) == row:
+                del rows[node_id]
+            saved_nodes.pop(row, None)
+            states.pop(row, None)
+            self.edges.pop(row, None)
+
+        changed_edges = {}  # row -> tuple of target rows
+        if linker.version != self.version or node_rows:
+            iter_object, edges = linker._iter_object, self.edges
+            for node in nodes:
+                row = index[id(node)]
+                targets = tuple(index[id(target)] for target in iter_object(node))
+                if edges.get(row, ()) != targets:
+                    changed_edges[row] = edges[row] = targets
+
+        connection = self._connect()
+        try:
+            with connection:  # single transaction
+                if self.version is None:  # not saved or loaded before: replace an existing file
+                    for table in ('info', 'nodes', 'edges'):
+                        connection.execute(f"DELETE FROM {table}")
+                info = [('name', linker.name), ('reverse_name', linker.reverse_name), ('start', index[id(start_obj)])]
+                connection.executemany("INSERT OR REPLACE INTO info VALUES (?, ?)", info)
+                connection.executemany("DELETE FROM nodes WHERE id = ?", ((row,) for row in removed))
+                connection.executemany("DELETE FROM edges WHERE source = ?",
+                                       ((row,) for row in removed + list(changed_edges)))
+                connection.executemany("INSERT OR REPLACE INTO nodes VALUES (?, ?, ?)", node_rows)
+                connection.executemany("INSERT INTO edges VALUES (?, ?, ?)",
+                                       ((row, position, target) for row, targets in changed_edges.items()
+                                        for position, target in enumerate(targets)))
+        finally:
+            connection.close()
+        self.version = linker.version
+        return len(node_rows), len(changed_edges)
+
+    def load(self, classes=()):
+        """
+        Creates the nodes (without calling __init__) and links them, without validating each link.
+        :param classes: classes of the nodes that cannot be imported by name (e.g. defined in a function)
+        :return: the start node of the last save
+        """
+        linker = self.linker
+        classes = {_class_name(cls): cls for cls in classes}  # also caches imported classes
+        connection = self._connect()
+        try:
+            info = dict(connection.execute("SELECT key, value FROM info"))
+            if info.get('name') != linker.name:
+                raise ValueError(f"graph '{info.get('name')}' in '{self.path}' cannot be loaded in graph '{linker.name}'")
+            rows, ids, nodes, states, edges = {}, {}, {}, {}, {}
+            node_rows = connection.execute("SELECT id, class, state FROM nodes").fetchall()
+            for row, class_name, _ in node_rows:  # all nodes are needed before unpickling references
+                cls = classes.get(class_name)
+                if cls is None:
+                    cls = classes[class_name] = self._import(class_name)
+                node = nodes[row] = cls.__new__(cls)
+                rows[id(node)], ids[row] = row, id(node)
+            for row, _, state in node_rows:
+                nodes[row].__dict__.update(NodeUnpickler(io.BytesIO(state), nodes).load())
+                states[row] = blake2b(state, digest_size=16).digest()
+            targets = []
+            source = None
+            for row, target in connection.execute("SELECT source, target FROM edges ORDER BY source, position"):
+                if row != source:
+                    if targets:
+                        edges[source] = tuple(targets)
+                    source, targets = row, []
+                targets.append(target)
+            if targets:
+                edges[source] = tuple(targets)
+        finally:
+            connection.close()
+
+        link_nodes(linker, nodes, edges)
+        self.rows, self.ids, self.nodes, self.states, self.edges = rows, ids, WeakValueDictionary(nodes), states, edges
+        self.version = linker.version
+        return nodes.get(info.get('start'))
+
+    @staticmethod
+    def _import(class_name):
+        module_name, qualname = class_name.split(':')
+        obj = import_module(module_name)
+        try:
+            for name in qualname.split('.'):
+                obj = getattr(obj, name)
+        except AttributeError:
+            raise ValueError(f"class '{class_name}' cannot be imported: pass it in 'classes'")
+        return obj
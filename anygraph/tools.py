@@ -1,4 +1,5 @@
 import random
+from collections import OrderedDict, namedtuple
 from contextlib import contextmanager
 from time import perf_counter
 from types import MethodType
@@ -47,6 +48,61 @@ def bind_builtin_to_instance(obj, **builtin_funcs):
         setattr(obj, name, MethodType(func, obj))
 
 
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class LRUCache(object):
+    """ mapping with a maximum size, evicting the least recently used items; keeps hit and miss statistics """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def get(self, key, default=None, valid=None):
+        """ returns the value of key, or default if missing or if valid(value) is false (the item is then removed) """
+        try:
+            value = self.items[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        if valid is not None and not valid(value):
+            del self.items[key]
+            self.misses += 1
+            return default
+        self.items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """ adds or updates the item; returns the evicted (key, value) pair if the cache was full, otherwise None """
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if len(self.items) > self.maxsize:
+            return self.items.popitem(last=False)
+        return None
+
+    def touch(self, key):
+        """ marks the item with key (if present) as most recently used, without counting a hit """
+        if key in self.items:
+            self.items.move_to_end(key)
+
+    def pop(self, key, default=None):
+        return self.items.pop(key, default)
+
+    def clear(self):
+        self.items.clear()
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.items))
+
+
 def save_graph_image(name, pairs, directed=True, filename='png', view=True, **options):
     try:
         import graphviz
@@ -1,8 +1,37 @@
 import unittest
+import asyncio
+import copy
+import gc
+import io
+import os
+import pickle
+import sqlite3
+import tempfile
+import time
 import uuid
+import weakref
 from random import choice
 
-from anygraph import One, Many
+from anygraph import One, Many, ManyMap, Iterator
+from anygraph.linkers import BaseLinker
+
+
+class PickledNode(object):  # classes must be importable to be pickled
+    nexts = Many('prevs', number_nodes=True)
+    prevs = Many('nexts')
+    kids = ManyMap('parents', key='name')
+    parents = ManyMap('kids', key='name')
+
+    def __init__(self, name):
+        self.name = name
+
+
+class PickledChain(object):
+    next = One('prev')
+    prev = One('next')
+
+    def __init__(self, name):
+        self.name = name
 
 
 class TestLinkers(unittest.TestCase):
@@ -81,6 +110,33 @@ class TestLinkers(unittest.TestCase):
 
         assert list(TestMany.nexts.iterate(bob)) == [bob, ann, pete, howy]
 
+    def test_include_by_identity(self):
+        class TestMany(object):
+            nexts = Many()
+
+            def __init__(self, name):
+                self.name = name
+
+            def __eq__(self, other):  # all equal, so membership must be by identity
+                return True
+
+            def __hash__(self):
+                return 0
+
+        hub = TestMany('hub')
+        targets = [TestMany(str(i)) for i in range(1000)]
+
+        hub.nexts.include(*targets)
+        hub.nexts.include(*targets)
+        assert len(hub.nexts) == 1000
+        assert list(hub.nexts) == targets  # insertion order is kept
+
+        hub.nexts.exclude(*targets[::2])
+        assert list(hub.nexts) == targets[1::2]
+
+        hub.nexts.exclude(TestMany('other'))
+        assert len(hub.nexts) == 500
+
     def test_cyclic(self):
         class TestMany(object):
             nexts = Many(cyclic=False)
@@ -99,6 +155,206 @@ class TestLinkers(unittest.TestCase):
         with self.assertRaises(ValueError):
             howy.nexts.include(bob)
 
+    def test_cyclic_random_order(self):
+        class TestMany(object):
+            nexts = Many(cyclic=False)
+
+            def __init__(self, name):
+                self.name = name
+
+        nodes = [TestMany(i) for i in range(30)]
+        iterator = Iterator('nexts')
+
+        for _ in range(300):
+            node1, node2 = choice(nodes), choice(nodes)
+            creates_cycle = node1 is node2 or any(n is node1 for n in iterator(node2))
+            if creates_cycle and node2 not in node1.nexts:
+                with self.assertRaises(ValueError):
+                    node1.nexts.include(node2)
+            else:
+                node1.nexts.include(node2)
+
+        for node in nodes:
+            assert not TestMany.nexts.in_cycle(node)
+
+    def test_cyclic_chain_backwards(self):
+        class TestOne(object):
+            next = One(cyclic=False)
+
+        nodes = [TestOne() for _ in range(100)]
+        for node1, node2 in reversed(list(zip(nodes[:-1], nodes[1:]))):
+            node1.next = node2
+
+        with self.assertRaises(ValueError):
+            nodes[-1].next = nodes[0]
+
+        nodes[0].next = nodes[-1]
+        with self.assertRaises(ValueError):
+            nodes[-1].next = nodes[1]
+
+        nodes[0].next = nodes[1]
+        assert list(TestOne.next.iterate(nodes[0])) == nodes
+
+    def test_cyclic_mixed_classes(self):
+        class Cyclic(object):
+            mixed = Many()
+
+        class Acyclic(object):
+            mixed = Many(cyclic=False)
+
+        cyclic, acyclic = Cyclic(), Acyclic()
+        cyclic.mixed.include(acyclic)  # not checked and not ordered
+        with self.assertRaises(ValueError):
+            acyclic.mixed.include(cyclic)
+
+        first, last, between = Acyclic(), Acyclic(), Cyclic()
+        first.mixed.include(between)
+        between.mixed.include(last)
+        with self.assertRaises(ValueError):
+            last.mixed.include(first)
+        last.mixed.include(Acyclic())
+
+    def test_cyclic_lazy_loader(self):
+        store = {0: [1], 1: [2], 2: [], 3: [4], 4: [3], 5: []}
+
+        class Lazy(object):
+            lazy_nexts = Many(cyclic=False, loader=lambda node: [nodes[i] for i in store[node.name]])
+
+            def __init__(self, name):
+                self.name = name
+
+        nodes = [Lazy(i) for i in range(6)]
+        with self.assertRaises(ValueError):
+            nodes[2].lazy_nexts.include(nodes[0])  # 0 -> 1 -> 2 is loaded to check
+        nodes[2].lazy_nexts.include(nodes[5])
+        with self.assertRaises(ValueError):
+            nodes[5].lazy_nexts.include(nodes[1])
+
+        assert list(nodes[3].lazy_nexts) == [nodes[4]]
+        with self.assertRaises(ValueError):
+            list(nodes[4].lazy_nexts)  # loaded links close a cycle
+
+    def test_cyclic_loaded(self):
+        class Stored(object):
+            loaded_nexts = Many('loaded_prevs', cyclic=False)
+            loaded_prevs = Many('loaded_nexts')
+
+        nodes = [Stored() for _ in range(20)]
+        for i in range(19):
+            nodes[i].loaded_nexts.include(nodes[i + 1])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.db')
+            Stored.loaded_nexts.save_graph(nodes[0], path)
+            first = Stored.loaded_nexts.load_graph(path, classes=[Stored])
+        last = list(Stored.loaded_nexts.iterate(first))[-1]
+        with self.assertRaises(ValueError):
+            last.loaded_nexts.include(first)
+        first.loaded_nexts.include(last)
+        assert 'loaded_nexts' not in BaseLinker._unordered_names  # the loaded nodes were ordered
+
+    def test_set_validated_in_batch(self):
+        class TestMany(object):
+            nexts = Many(cyclic=False)
+
+            def __init__(self, name):
+                self.name = name
+
+        bob = TestMany('bob')
+        ann = TestMany('ann')
+        pete = TestMany('pete')
+        howy = TestMany('howy')
+
+        bob.nexts = [ann, pete]
+        pete.nexts = [howy]
+
+        bob.nexts = [pete, howy, howy]
+        assert list(bob.nexts) == [pete, howy]
+
+        with self.assertRaises(ValueError):
+            howy.nexts = [ann, bob]
+        assert len(howy.nexts) == 0  # nothing was linked
+
+        with self.assertRaises(ValueError):
+            pete.nexts.include(ann, bob)
+        assert list(pete.nexts) == [howy]
+
+        children = [TestMany(i) for i in range(10000)]
+        bob.nexts = children
+        bob.nexts = children[::-1]
+        assert list(bob.nexts) == children[::-1]
+
+    def test_reach_index(self):
+        class Indexed(object):
+            nexts = Many(reach_index=True)
+
+            def __init__(self, name):
+                self.name = name
+
+        class Plain(object):
+            nexts = Many()
+
+            def __init__(self, name):
+                self.name = name
+
+        indexed = [Indexed(i) for i in range(30)]
+        plain = [Plain(i) for i in range(30)]
+        for _ in range(3):
+            for _ in range(20):
+                i, j = choice(range(30)), choice(range(30))
+                indexed[i].nexts.include(indexed[j])
+                plain[i].nexts.include(plain[j])
+            for i in range(30):
+                for j in range(30):
+                    assert Indexed.nexts.reachable(indexed[i], indexed[j]) == Plain.nexts.reachable(plain[i], plain[j])
+                assert Indexed.nexts.in_cycle(indexed[i]) == Plain.nexts.in_cycle(plain[i])
+            i = choice(range(30))
+            del indexed[i].nexts
+            del plain[i].nexts
+
+    def test_strongly_connected_components(self):
+        class Node(object):
+            nexts = Many()
+
+            def __init__(self, name):
+                self.name = name
+
+        a, b, c, d, e = nodes = [Node(n) for n in 'abcde']
+        a.nexts = [b, c]
+        b.nexts.include(d)
+        c.nexts.include(d)  # diamond, not a cycle
+        assert not Node.nexts.is_cyclic(a)
+        assert len(Node.nexts.strongly_connected_components(a)) == 4
+
+        d.nexts.include(e)
+        e.nexts.include(b)
+        components = Node.nexts.strongly_connected_components(a)
+        assert [sorted(n.name for n in comp) for comp in components][-2:] == [['c'], ['a']]
+        assert sorted(n.name for n in components[0]) == ['b', 'd', 'e']
+        assert Node.nexts.is_cyclic(a) and Node.nexts.is_cyclic(c)
+        assert [Node.nexts.in_cycle(n) for n in nodes] == [False, True, False, True, True]
+
+        condensation = Node.nexts.condensation(a)
+        assert condensation is Node.nexts.condensation(a)  # cached
+        assert condensation.component(d) is condensation.component(e)
+        assert len(condensation.cycles()) == 1
+
+        e.nexts.exclude(b)
+        assert Node.nexts.condensation(a) is not condensation
+        assert not Node.nexts.is_cyclic(a)
+        assert not any(Node.nexts.in_cycle(n) for n in nodes)
+
+    def test_strongly_connected_components_long(self):
+        class Node(object):
+            nexts = One()
+
+        nodes = [Node() for _ in range(10000)]
+        for node, next_node in zip(nodes[:-1], nodes[1:]):
+            node.nexts = next_node
+        assert len(Node.nexts.strongly_connected_components(nodes[0])) == 10000
+        nodes[-1].nexts = nodes[0]
+        assert len(Node.nexts.strongly_connected_components(nodes[0])) == 1
+        assert all(Node.nexts.in_cycle(node) for node in nodes)
+
     def test_to_self(self):
         class TestMany(object):
             nexts = Many(to_self=False)
@@ -467,6 +723,19 @@ class TestDoubleLinkers(unittest.TestCase):
         with self.assertRaises(ValueError):
             bob.prevs.include(howy)
 
+        howy.prevs.include(ann)
+        with self.assertRaises(ValueError):
+            bob.prevs.include(ann)
+        with self.assertRaises(ValueError):
+            howy.nexts.include(ann)
+
+        with self.assertRaises(ValueError):
+            bob.prevs = [pete, ann]
+        assert len(bob.prevs) == 0
+
+        howy.prevs = [bob, ann, pete]
+        assert howy in bob.nexts and howy in ann.nexts and howy in pete.nexts
+
     def test_on_link(self):
         on_link_results = []
         on_unlink_results = []
@@ -497,6 +766,62 @@ class TestDoubleLinkers(unittest.TestCase):
         del bob.nexts
         assert on_unlink_results == [(bob, ann), (bob, pete)]
 
+    def test_transaction(self):
+        on_link_results = []
+        on_unlink_results = []
+
+        class TestMany(object):
+            nexts = Many('prevs', cyclic=False,
+                         on_link=lambda one, two: on_link_results.append((one, two)),
+                         on_unlink=lambda one, two: on_unlink_results.append((one, two)))
+            prevs = Many('nexts')
+
+            def __init__(self, name):
+                self.name = name
+
+        bob = TestMany('bob')
+        ann = TestMany('ann')
+        pete = TestMany('pete')
+        howy = TestMany('howy')
+
+        bob.nexts.include(ann, pete)
+        del on_link_results[:]
+
+        with TestMany.nexts.transaction():
+            pete.nexts.include(howy)
+            howy.prevs.include(ann)
+            bob.nexts.exclude(ann)
+            bob.nexts.include(ann)  # net: no change
+            assert not on_link_results and not on_unlink_results  # deferred
+
+        assert on_link_results == [(pete, howy), (ann, howy)]
+        assert on_unlink_results == []
+        del on_link_results[:]
+
+        with self.assertRaises(ValueError):
+            with TestMany.nexts.transaction():
+                bob.nexts = [howy]
+                ann.prevs.exclude(bob)
+                howy.nexts.include(bob)  # creates cycle
+
+        assert list(bob.nexts) == [pete, ann]
+        assert list(ann.prevs) == [bob]
+        assert list(howy.prevs) == [pete, ann]
+        assert len(howy.nexts) == 0
+        assert on_link_results == on_unlink_results == []
+
+        a, b = TestMany('a'), TestMany('b')
+        a.nexts.include(b)
+        with self.assertRaises(ValueError):
+            with TestMany.nexts.transaction():
+                a.nexts.exclude(b)
+                b.nexts.include(a)  # no cycle without a -> b, changes the topological order
+                raise ValueError
+        assert list(a.nexts) == [b] and len(b.nexts) == 0
+        with self.assertRaises(ValueError):
+            b.nexts.include(a)  # the order is rolled back as well
+        assert not TestMany.nexts.is_cyclic(a)
+
     def test_custom_id(self):
         class TestMany(object):
             nexts = Many('prevs', get_id=lambda obj: hash(obj))
@@ -618,6 +943,100 @@ class TestDoubleLinkers(unittest.TestCase):
         assert howy.nexts == {ann}
         assert howy.prevs == {pete}
 
+    def test_builder_workers(self):
+
+        class TestBuilder(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+            def __init__(self, name, items=()):
+                self.name = name
+                self.items = list(items)
+
+        def create():
+            nodes = [TestBuilder(str(i)) for i in range(200)]
+            for i, node in enumerate(nodes):
+                node.items.extend(nodes[j] for j in (2 * i + 1, 2 * i + 2, i // 3) if j < len(nodes))
+            return nodes
+
+        def fetch(obj):
+            time.sleep(0.001)  # e.g. I/O
+            return obj.items
+
+        serial, threaded = create(), create()
+        TestBuilder.nexts.build(serial[0], key=fetch)
+        TestBuilder.nexts.build(threaded[0], key=fetch, workers=8)
+
+        for node1, node2 in zip(serial, threaded):
+            assert [n.name for n in node1.nexts] == [n.name for n in node2.nexts]
+            assert [n.name for n in node1.prevs] == [n.name for n in node2.prevs]
+        assert [n.name for n in TestBuilder.nexts.iterate(serial[0], breadth_first=True)] == \
+               [n.name for n in TestBuilder.nexts.iterate(threaded[0], breadth_first=True)]
+
+    def test_builder_async(self):
+
+        class TestBuilder(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+            def __init__(self, name, items=()):
+                self.name = name
+                self.items = list(items)
+
+            async def __aiter__(self):
+                for item in self.items:
+                    yield item
+
+        def create():
+            nodes = [TestBuilder(str(i)) for i in range(100)]
+            for i, node in enumerate(nodes):
+                node.items.extend(nodes[j] for j in (2 * i + 1, 2 * i + 2, i // 3) if j < len(nodes))
+            return nodes
+
+        running = [0, 0]  # current and maximum number of running calls to key
+
+        async def fetch(obj):
+            running[0] += 1
+            running[1] = max(running)
+            await asyncio.sleep(0.001)  # e.g. I/O
+            running[0] -= 1
+            return obj.items
+
+        def run(coroutine):  # as asyncio.run (Python 3.7+)
+            loop = asyncio.new_event_loop()
+            try:
+                return loop.run_until_complete(coroutine)
+            finally:
+                loop.close()
+
+        serial, by_func, by_name = create(), create(), create()
+        TestBuilder.nexts.build(serial[0], key=lambda obj: obj.items)
+        run(TestBuilder.nexts.abuild(by_func[0], key=fetch, concurrency=4))
+        run(TestBuilder.nexts.abuild(by_name[0], key='__aiter__'))
+        assert running[1] == 4
+
+        for nodes in (by_func, by_name):
+            for node1, node2 in zip(serial, nodes):
+                assert [n.name for n in node1.nexts] == [n.name for n in node2.nexts]
+                assert [n.name for n in node1.prevs] == [n.name for n in node2.prevs]
+
+        async def aiterate(start, **kwargs):
+            return [n.name async for n in TestBuilder.nexts.aiterate(start, **kwargs)]
+
+        for breadth_first in (False, True):
+            names = [n.name for n in TestBuilder.nexts.iterate(serial[0], breadth_first=breadth_first)]
+            assert run(aiterate(serial[0], breadth_first=breadth_first)) == names
+            assert run(aiterate(serial[0], key=fetch, breadth_first=breadth_first)) == names
+
+        async def unlink(start):  # changes links while iterating
+            visited = []
+            async for node in TestBuilder.nexts.aiterate(start):
+                visited.append(node)
+                del node.prevs
+            return visited
+
+        assert not any(node.prevs for node in run(unlink(serial[0])))
+
     def test_builder_one(self):
 
         class TestBuilder(object):
@@ -671,6 +1090,277 @@ class TestDoubleLinkers(unittest.TestCase):
 
         assert Test.nexts.gather(bob) == [bob, ann, pete, howy]
 
+    def test_track_components(self):
+
+        class Tracked(object):
+            nexts = Many('prevs', track_components=True)
+            prevs = Many('nexts')
+
+        class Plain(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+        tracked = [Tracked() for _ in range(40)]
+        plain = [Plain() for _ in range(40)]
+
+        def check():
+            for i in range(40):
+                gathered = {tracked.index(n) for n in Tracked.nexts.gather(tracked[i])}
+                assert gathered == {plain.index(n) for n in Plain.nexts.gather(plain[i])}
+                assert Tracked.nexts.component_size(tracked[i]) == len(gathered)
+                j = choice(range(40))
+                assert Tracked.prevs.same_component(tracked[i], tracked[j]) == (j in gathered)
+
+        for _ in range(5):
+            for _ in range(25):
+                i, j = choice(range(40)), choice(range(40))
+                tracked[i].nexts.include(tracked[j])
+                plain[i].nexts.include(plain[j])
+            check()
+            for _ in range(10):
+                i, j = choice(range(40)), choice(range(40))
+                tracked[i].prevs.exclude(tracked[j])
+                plain[i].prevs.exclude(plain[j])
+                del tracked[j].nexts
+                del plain[j].nexts
+            check()
+
+        a, b, c = Tracked(), Tracked(), Tracked()
+        a.nexts.include(b)
+        with self.assertRaises(ValueError):
+            with Tracked.nexts.transaction():
+                b.nexts.include(c)
+                a.nexts.exclude(b)
+                raise ValueError
+        assert Tracked.nexts.same_component(a, b) and not Tracked.nexts.same_component(b, c)
+
+        tracker = Tracked.nexts._components
+        for node in tracked:
+            del node.nexts, node.prevs
+        del tracked[:], a, b, c
+        gc.collect()
+        assert len(tracker) == 0  # dropped nodes are not kept alive
+        for _ in range(3):  # new nodes can get the ids of the dropped nodes
+            nodes = [Tracked() for _ in range(10)]
+            for node1, node2 in zip(nodes[:5], nodes[1:5]):
+                node1.nexts.include(node2)
+            assert Tracked.nexts.component_size(nodes[0]) == 5 and Tracked.nexts.component_size(nodes[5]) == 1
+            references = [weakref.ref(node) for node in nodes]
+            del nodes, node1, node2
+            gc.collect()
+            assert all(reference() is None for reference in references)
+        assert len(tracker) == 0
+
+        with self.assertRaises(ValueError):
+            class Failing(object):
+                nexts = Many(track_components=True)
+
+    def test_lazy_loader(self):
+        store = {i: [(i + 1) % 100, (i * 7) % 100] for i in range(100)}  # e.g. a database table
+        loads = []
+
+        def load_nexts(node):
+            loads.append(node.name)
+            return [Lazy.get(name) for name in store[node.name]]
+
+        class Lazy(object):
+            nexts = Many(loader=load_nexts, max_loaded=10)
+            nodes = {}
+
+            @classmethod
+            def get(cls, name):
+                if name not in cls.nodes:
+                    cls.nodes[name] = cls(name)
+                return cls.nodes[name]
+
+            def __init__(self, name):
+                self.name = name
+
+        start = Lazy.get(0)
+        assert loads == []
+        assert [n.name for n in start.nexts] == [1, 0]
+        assert loads == [0]
+        assert [n.name for n in Lazy.nexts.shortest_path(start, Lazy.get(3))] == [0, 1, 2, 3]
+        assert len(set(loads)) < 10  # only the part of the graph needed
+
+        assert len([n for n in Lazy.nexts.iterate(start)]) == 100
+        assert len(Lazy.nexts._loaded) == 10  # the links of other nodes were dropped
+        del loads[:]
+        assert [n.name for n in start.nexts] == [1, 0]  # loaded again
+        assert loads == [0]
+
+        start.nexts.include(Lazy.get(50))  # changed links are kept
+        for _ in Lazy.nexts.iterate(Lazy.get(1)):
+            pass
+        assert id(start.nexts) not in Lazy.nexts._loaded
+        assert [n.name for n in start.nexts] == [1, 0, 50]
+        assert loads.count(0) == 1
+
+        with self.assertRaises(ValueError):
+            class Failing(object):
+                nexts = Many(max_loaded=10)
+
+    def test_save_load_graph(self):
+
+        class Stored(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+            def __init__(self, name):
+                self.name = name
+
+        def structure(start):
+            return {n.name: ([t.name for t in n.nexts], sorted((t.name for t in n.prevs), key=str))
+                    for n in Stored.nexts.gather(start)}
+
+        nodes = [Stored(i) for i in range(50)]
+        for i in range(49):
+            nodes[i].nexts.include(nodes[i + 1], nodes[(i * 7) % 50])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.db')
+            assert Stored.nexts.save_graph(nodes[10], path) == (50, 49)
+            assert Stored.nexts.save_graph(nodes[10], path) == (0, 0)  # nothing changed
+
+            nodes[3].name = 'three'
+            nodes[5].nexts.exclude(nodes[6])
+            assert Stored.nexts.save_graph(nodes[10], path) == (1, 1)
+
+            loaded = Stored.nexts.load_graph(path, classes=[Stored])
+            assert loaded is not nodes[10] and loaded.name == 10
+            assert structure(loaded) == structure(nodes[10])
+
+            loaded.nexts.include(loaded)
+            assert Stored.nexts.save_graph(loaded, path) == (0, 1)
+            assert structure(Stored.nexts.load_graph(path, classes=[Stored])) == structure(loaded)
+
+            Stored.nexts.save_graph(nodes[10], path)
+            tail = nodes[40]  # replace the saved nodes after it by new nodes (likely with the id() of deleted ones)
+            for node in nodes[41:]:
+                del node.nexts, node.prevs
+            del nodes[41:], loaded
+            gc.collect()
+            tail.nexts.include(*(Stored(f'new {i}') for i in range(5)))
+            assert Stored.nexts.save_graph(nodes[10], path)[0] == 5
+            assert structure(Stored.nexts.load_graph(path, classes=[Stored])) == structure(nodes[10])
+
+            with self.assertRaises(ValueError):
+                Stored.nexts.load_graph(path)  # class defined in function
+            with self.assertRaises(ValueError):
+                Stored.prevs.load_graph(path, classes=[Stored])  # saved by other graph
+
+        class Ordered(object):
+            nexts = Many('prevs', cyclic=False)
+            prevs = Many('nexts')
+
+            def __init__(self, name):
+                self.name = name
+
+        nodes = [Ordered(i) for i in range(20)]
+        for node1, node2 in zip(nodes, nodes[1:10] + [None] + nodes[11:]):
+            if node2 is not None:
+                node1.nexts.include(node2)
+        nodes[0].nexts.include(nodes[10])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.db')
+            assert Ordered.nexts.save_graph(nodes[0], path) == (20, 18)
+            orders = [node.__dict__.get('_nexts_order') for node in nodes]
+            nodes[9].nexts.include(nodes[10])  # raises the topological order of nodes[10:]
+            assert orders != [node.__dict__.get('_nexts_order') for node in nodes]
+            assert Ordered.nexts.save_graph(nodes[0], path) == (0, 1)  # the order is not saved
+
+    def test_save_graph_references(self):
+
+        class Stored(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+            friends = Many()
+
+            def __init__(self, name, best=None):
+                self.name = name
+                self.best = best
+
+        nodes = [Stored(i) for i in range(300)]
+        for i in range(299):
+            nodes[i].nexts.include(nodes[i + 1])
+        nodes[0].friends.include(nodes[1])
+        nodes[2].best = nodes[299]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'graph.db')
+            Stored.nexts.save_graph(nodes[0], path)
+            with sqlite3.connect(path) as connection:
+                assert max(len(state) for state, in connection.execute("SELECT state FROM nodes")) < 1000
+
+            loaded = Stored.nexts.load_graph(path, classes=[Stored])
+            loaded_nodes = list(Stored.nexts.iterate(loaded))
+            assert len(loaded_nodes) == 300
+            assert list(loaded.friends) == [loaded_nodes[1]]  # same node, not a copy
+            assert loaded_nodes[2].best is loaded_nodes[299]
+
+    def test_pickle_deep_graph(self):
+        count = 5000  # deeper than the recursion limit
+        nodes = [PickledNode(str(i)) for i in range(count)]
+        for i in range(count - 1):
+            nodes[i].nexts.include(nodes[i + 1], nodes[(i * 7) % count])
+            nodes[i].kids.include(nodes[i + 1])
+
+        def names(node, linker):
+            return [n.name for n in linker.iterate(node)]
+
+        key = PickledNode.nexts._numbers.key
+        for copied in (pickle.loads(pickle.dumps(nodes[3])), copy.deepcopy(nodes[3])):
+            assert copied is not nodes[3] and copied.name == '3'
+            assert copied.__dict__.get(key) is None  # node numbers are not copied
+            for linker in (PickledNode.nexts, PickledNode.prevs, PickledNode.kids, PickledNode.parents):
+                assert names(copied, linker) == names(nodes[3], linker)
+            assert copied.nexts.owner is copied and copied.nexts.linker is PickledNode.nexts
+            assert copied.kids['4'].parents['3'] is copied
+            copied.nexts.include(copied)  # still linked in both directions
+            assert copied in copied.prevs and copied not in nodes[3].prevs
+
+        chain = [PickledChain(i) for i in range(count)]
+        for i in range(count - 1):
+            chain[i].next = chain[i + 1]
+        file = io.BytesIO()
+        PickledChain.next.dump(chain[10], file)
+        file.seek(0)
+        loaded = PickledChain.next.load(file)
+        assert loaded.name == 10 and loaded.prev.next is loaded
+        assert [n.name for n in PickledChain.prev.iterate(loaded)] == list(range(10, -1, -1))
+        assert len(list(PickledChain.next.iterate(loaded))) == count - 10
+        file.seek(0)
+        with self.assertRaises(ValueError):
+            PickledChain.prev.load(file)
+
+    def test_graph_not_kept_alive(self):
+        class Node(object):
+            nexts = Many('prevs', reach_index=True)
+            prevs = Many('nexts')
+
+        nodes = [Node() for _ in range(10)]
+        for i in range(9):
+            nodes[i].nexts.include(nodes[i + 1], nodes[0])
+        assert Node.nexts.reachable(nodes[3], nodes[1]) and Node.nexts.in_cycle(nodes[3])
+        assert Node.nexts.is_cyclic(nodes[5]) and Node.nexts.condensation(nodes[0]).in_cycle(nodes[8])
+        copied = copy.deepcopy(nodes[0])  # cached values are not copied
+        assert copied in Node.nexts.condensation(copied) and Node.nexts.in_cycle(copied)
+        with tempfile.TemporaryDirectory() as directory:
+            Node.nexts.save_graph(nodes[0], os.path.join(directory, 'graph.db'))
+        reference = weakref.ref(nodes[0])
+        del nodes, copied
+        gc.collect()
+        assert reference() is None
+
+        nodes = [PickledNode(str(i)) for i in range(10)]
+        for i in range(9):
+            nodes[i].nexts.include(nodes[i + 1])
+        pickle.loads(pickle.dumps(nodes[0]))
+        reference = weakref.ref(nodes[0])
+        del nodes
+        gc.collect()
+        assert reference() is None
+
     def test_gather_pairs_directed(self):
 
         class Test(object):
@@ -1,8 +1,12 @@
+import random
 import unittest
+from copy import deepcopy
 from itertools import product
 
-from anygraph import Many, One, Iterator, GetEndpoints
+from anygraph import Many, One, ManyMap, Iterator, GetEndpoints, Find, FindOne, Has, Count
+from anygraph.frozen import FrozenGraph
 from anygraph.tools import chained, flipcoin
+from anygraph.vectorized import numpy
 
 
 class TestPropagator(unittest.TestCase):
@@ -36,6 +40,73 @@ class TestPropagator(unittest.TestCase):
             iterator = Iterator('prevs')
             assert len(list(iterator.iterate(objs[count - 1], breadth_first=breadth_first))) == count
 
+    def test_depth_first_lazy(self):
+        class Node(object):
+            nexts = Many()
+
+        pulled = []
+
+        class Pulled(Iterator):
+            def iter_object(self, obj):
+                for next_obj in super().iter_object(obj):
+                    pulled.append(next_obj)
+                    yield next_obj
+
+        root = Node()
+        root.nexts = [Node() for _ in range(100)]
+        iterator = Pulled('nexts')
+        for _ in zip(range(3), iterator.iterate(root)):
+            pass
+        assert len(pulled) == 2  # no list of all next nodes is made
+
+    def test_depth_first_change_links(self):
+        class Node(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+        for _ in range(20):
+            nodes = [Node() for _ in range(10)]
+            for node1 in nodes:
+                node1.nexts = [node2 for node2 in nodes if flipcoin(0.3)]
+            for node in list(Node.nexts.iterate(nodes[0], max_depth=random.choice([None, 3]))):
+                if flipcoin():
+                    del node.prevs
+                else:
+                    node.nexts.include(random.choice(nodes))
+            for event, node, _, _ in list(Node.nexts.depth_first_events(nodes[0])):
+                if event == 'discover':
+                    node.nexts.clear()
+            assert len(nodes[0].nexts) == 0
+
+    def test_depth_first_events(self):
+        class Node(object):
+            nexts = Many()
+
+            def __init__(self, name):
+                self.name = name
+
+        a, b, c, d = nodes = [Node(n) for n in 'abcd']
+        a.nexts = [b, c]
+        b.nexts.include(d)
+        c.nexts.include(d)
+        d.nexts.include(b)
+
+        events = [(event, node.name, depth, parent and parent.name) for event, node, depth, parent
+                  in Node.nexts.depth_first_events(a)]
+        assert events == [('discover', 'a', 0, None), ('discover', 'b', 1, 'a'), ('discover', 'd', 2, 'b'),
+                          ('back', 'b', 3, 'd'), ('finish', 'd', 2, 'b'), ('finish', 'b', 1, 'a'),
+                          ('discover', 'c', 1, 'a'), ('cross', 'd', 2, 'c'), ('finish', 'c', 1, 'a'),
+                          ('finish', 'a', 0, None)]
+
+        for _ in range(20):
+            for node1 in nodes:
+                node1.nexts = [node2 for node2 in nodes if flipcoin(0.3)]
+            events = list(Node.nexts.depth_first_events(a))
+            discovered = [node for event, node, _, _ in events if event == 'discover']
+            assert discovered == list(Node.nexts.iterate(a))
+            assert sorted(n.name for e, n, _, _ in events if e == 'finish') == sorted(n.name for n in discovered)
+            assert any(e == 'back' for e, _, _, _ in events) == Node.nexts.is_cyclic(a)
+
     def test_endpoint(self):
         class StartPoint(object):
             next = One('prev')
@@ -95,6 +166,252 @@ class testPathMethods(unittest.TestCase):
             for o1, o2 in chained(path):
                 assert o2 in o1.nexts
 
+    def test_weighted_dijkstra(self):
+        class Node(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+            def __init__(self, num):
+                self.num = num
+
+        nodes = [Node(i) for i in range(30)]
+        for node1 in nodes:
+            for node2 in nodes:
+                if flipcoin(0.2):
+                    node1.nexts.include(node2)
+
+        weights = {}
+
+        def weight(node1, node2):
+            return weights.setdefault((node1.num, node2.num), random.randint(1, 20))
+
+        def path_cost(path):
+            return sum(weight(o1, o2) for o1, o2 in chained(path))
+
+        costs = {id(nodes[0]): 0}  # reference: Bellman-Ford
+        for _ in nodes:
+            for node1 in nodes:
+                for node2 in node1.nexts:
+                    if id(node1) in costs:
+                        cost = costs[id(node1)] + weight(node1, node2)
+                        if cost < costs.get(id(node2), float('inf')):
+                            costs[id(node2)] = cost
+
+        paths = Node.nexts.shortest_paths(nodes[0], nodes[1:], get_cost=weight, allow_partial=True)
+        assert len(paths) == len(costs) - 1
+        for path in paths:
+            assert path[0] is nodes[0]
+            assert path_cost(path) == costs[id(path[-1])]
+            assert path_cost(Node.nexts.shortest_path(nodes[0], path[-1], get_cost=weight)) == path_cost(path)
+            bidirectional_path = Node.nexts.shortest_path(nodes[0], path[-1], get_cost=weight, bidirectional=True)
+            assert bidirectional_path[0] is nodes[0] and bidirectional_path[-1] is path[-1]
+            assert path_cost(bidirectional_path) == path_cost(path)
+
+        for node in nodes[1:]:
+            if id(node) not in costs:
+                assert Node.nexts.shortest_path(nodes[0], node, get_cost=weight, bidirectional=True) is None
+
+        tree = Node.nexts.shortest_path_tree(nodes[0], get_cost=weight)
+        assert len(tree) == len(costs)
+        for node in nodes:
+            if id(node) in costs:
+                assert tree.cost(node) == costs[id(node)]
+                assert path_cost(tree.path(node)) == costs[id(node)]
+                assert tree.path(node)[-2:-1] == ([tree.predecessor(node)] if node is not nodes[0] else [])
+            else:
+                assert node not in tree
+                assert tree.cost(node) is tree.path(node) is None
+
+        max_cost = sorted(costs.values())[len(costs) // 2]
+        tree = Node.nexts.shortest_path_tree(nodes[0], get_cost=weight, max_cost=max_cost)
+        assert len(tree) == len([c for c in costs.values() if c <= max_cost])
+        assert all(tree.cost(node) <= max_cost for node in tree)
+
+    def test_bidirectional_astar(self):
+        class Node(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+            def __init__(self, i, j):
+                self.index = (i, j)
+
+        size = 15
+        nodes = {(i, j): Node(i, j) for i in range(size) for j in range(size)}
+        for (i, j), node in nodes.items():
+            for di, dj in product([-1, 0, 1], [-1, 0, 1]):
+                if (i + di, j + dj) in nodes and (flipcoin(0.7) or i == 0 or j == size - 1):
+                    node.nexts.include(nodes[i + di, j + dj])
+
+        def weight(node1, node2):
+            i1, j1 = node1.index
+            i2, j2 = node2.index
+            return abs(i1 - i2) + abs(j1 - j2)
+
+        def path_cost(path):
+            return sum(weight(o1, o2) for o1, o2 in chained(path))
+
+        start, end = nodes[0, 0], nodes[size - 1, size - 1]
+        path = Node.nexts.shortest_path(start, end, get_cost=weight)
+        for heuristic in (None, weight):
+            bidirectional_path = Node.nexts.shortest_path(start, end, get_cost=weight, heuristic=heuristic,
+                                                          bidirectional=True)
+            for o1, o2 in chained(bidirectional_path):
+                assert o2 in o1.nexts
+            assert path_cost(bidirectional_path) == path_cost(path)
+
+        assert Node.nexts.shortest_path(start, start, bidirectional=True) == [start]
+
+        class Single(object):
+            nexts = Many()
+
+        with self.assertRaises(ValueError):
+            Single.nexts.shortest_path(Single(), Single(), bidirectional=True)
+
+    def test_path_cache(self):
+        class Node(object):
+            nexts = Many('prevs', path_cache=2)
+            prevs = Many('nexts')
+
+            def __init__(self, num):
+                self.num = num
+
+        class Other(object):  # different class in the same graph
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+        nodes = [Node(i) for i in range(5)]
+        for node1, node2 in chained(nodes):
+            node1.nexts.include(node2)
+
+        assert Node.nexts.shortest_path(nodes[0], nodes[-1]) == nodes
+        assert Node.nexts.shortest_path(nodes[0], nodes[-1]) == nodes
+        assert Node.nexts.cache_info() == (1, 1, 2, 1)
+
+        assert Node.nexts.shortest_path(nodes[0], nodes[2]) == nodes[:3]
+        assert Node.nexts.shortest_path(nodes[1], nodes[2]) == nodes[1:3]
+        assert Node.nexts.shortest_path(nodes[0], nodes[-1]) == nodes  # evicted
+        assert Node.nexts.cache_info() == (1, 4, 2, 2)
+
+        other = Other()
+        nodes[0].nexts.include(other)
+        other.nexts.include(nodes[-1])  # linked via Other.nexts
+        assert Node.nexts.shortest_path(nodes[0], nodes[-1]) == [nodes[0], other, nodes[-1]]
+        assert Node.nexts.cache_info() == (1, 5, 2, 1)
+
+        other.prevs.exclude(nodes[0])  # unlinked via reverse
+        assert Node.nexts.shortest_path(nodes[0], nodes[-1]) == nodes
+        assert Node.nexts.cache_info() == (1, 6, 2, 1)
+
+        assert Node.nexts.shortest_path(nodes[-1], nodes[0]) is None
+        assert Node.nexts.shortest_path(nodes[-1], nodes[0]) is None
+        assert Node.nexts.cache_info() == (2, 7, 2, 2)
+
+    def test_cache_per_component(self):
+        for track_components in (False, True):
+            class Node(object):
+                nexts = Many('prevs', path_cache=10, track_components=track_components)
+                prevs = Many('nexts')
+
+            graph, unrelated = [Node() for _ in range(5)], [Node() for _ in range(5)]
+            for nodes in (graph, unrelated):
+                for node1, node2 in chained(nodes):
+                    node1.nexts.include(node2)
+            condensation = Node.nexts.condensation(graph[0])
+            assert Node.nexts.shortest_path(graph[0], graph[-1]) == graph
+
+            unrelated[-1].nexts.include(unrelated[0])  # only changes the version of the graph when tracked
+            assert (Node.nexts.condensation(graph[0]) is condensation) == track_components
+            assert Node.nexts.shortest_path(graph[0], graph[-1]) == graph
+            assert Node.nexts.cache_info().hits == (1 if track_components else 0)
+
+            graph[-1].nexts.include(graph[0])
+            assert Node.nexts.condensation(graph[0]) is not condensation
+            assert Node.nexts.in_cycle(graph[0]) and Node.nexts.in_cycle(unrelated[0])
+            graph[-1].nexts.exclude(graph[0])
+            assert not Node.nexts.in_cycle(graph[0])
+            assert Node.nexts.shortest_path(graph[0], graph[-1]) == graph
+            assert Node.nexts.cache_info().hits == (1 if track_components else 0)
+
+    def test_contraction_hierarchy(self):
+        class Node(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+            def __init__(self, num):
+                self.num = num
+
+        nodes = [Node(i) for i in range(40)]
+        for node1 in nodes:
+            for node2 in nodes:
+                if flipcoin(0.1):
+                    node1.nexts.include(node2)
+
+        weights = {}
+
+        def weight(node1, node2):
+            return weights.setdefault((node1.num, node2.num), random.randint(1, 20))
+
+        def path_cost(path):
+            return sum(weight(o1, o2) for o1, o2 in chained(path))
+
+        hierarchy = Node.nexts.preprocess_hierarchy(nodes[0], get_cost=weight)
+        for start in nodes[:10]:
+            if start not in hierarchy:
+                continue
+            tree = Node.nexts.shortest_path_tree(start, get_cost=weight)
+            for target in nodes:
+                if target not in hierarchy:
+                    continue
+                path = hierarchy.shortest_path(start, target)
+                if target in tree:
+                    assert path[0] is start and path[-1] is target
+                    for o1, o2 in chained(path):
+                        assert o2 in o1.nexts
+                    assert path_cost(path) == hierarchy.cost(start, target) == tree.cost(target)
+                else:
+                    assert path is hierarchy.cost(start, target) is None
+
+    def test_landmarks(self):
+        class Node(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+            def __init__(self, num):
+                self.num = num
+
+        class Single(object):
+            nexts = Many()
+
+            def __init__(self, num):
+                self.num = num
+
+        weights = {}
+
+        def weight(node1, node2):
+            return weights.setdefault((node1.num, node2.num), random.randint(1, 20))
+
+        def path_cost(path):
+            return sum(weight(o1, o2) for o1, o2 in chained(path))
+
+        for cls in (Node, Single):
+            nodes = [cls(i) for i in range(40)]
+            for node1, node2 in chained(nodes):
+                node1.nexts.include(node2)
+            for node1 in nodes:
+                for node2 in nodes:
+                    if flipcoin(0.05):
+                        node1.nexts.include(node2)
+
+            landmarks = cls.nexts.build_landmarks(nodes[0], count=4, get_cost=weight)
+            assert len(landmarks) == 4
+            for start in nodes[:10]:
+                tree = cls.nexts.shortest_path_tree(start, get_cost=weight)
+                for target in nodes:
+                    if target in tree:
+                        assert 0 <= landmarks(start, target) <= tree.cost(target)
+                        path = cls.nexts.shortest_path(start, target, get_cost=weight, heuristic=landmarks)
+                        assert path_cost(path) == tree.cost(target)
+
     def test_astar(self):
 
         class Node(object):
@@ -138,3 +455,279 @@ class testPathMethods(unittest.TestCase):
         if path:  # occasionally there is no path due to random matrix
             for o1, o2 in chained(path):
                 assert o2 in o1.nexts
+    def test_freeze(self):
+        class Node(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+            def __init__(self, num):
+                self.num = num
+
+        weights = {}
+
+        def weight(node1, node2):
+            return weights.setdefault((node1.num, node2.num), random.randint(1, 20))
+
+        def path_cost(path):
+            return sum(weight(o1, o2) for o1, o2 in chained(path))
+
+        nodes = [Node(i) for i in range(50)]
+        for node1 in nodes:
+            for node2 in nodes:
+                if flipcoin(0.04):
+                    node1.nexts.include(node2)
+        extra = Node(50)  # not connected
+
+        frozen = Node.nexts.freeze(nodes[0], get_cost=weight)
+        unweighted = Node.nexts.freeze(nodes[0])
+        assert extra not in frozen
+        assert frozen.edge_count == sum(len(node.nexts) for node in frozen.nodes)
+        assert set(frozen.to_nodes(frozen.gather(0))) == set(Node.nexts.gather(nodes[0]))
+
+        for start in frozen.nodes[:10]:
+            i = frozen.index_of(start)
+            assert frozen.to_nodes(frozen.iterate(i)) == list(Node.nexts.iterate(start))
+            assert frozen.to_nodes(frozen.iterate(i, breadth_first=True)) == \
+                   list(Node.nexts.iterate(start, breadth_first=True))
+            tree = Node.nexts.shortest_path_tree(start, get_cost=weight)
+            for target in frozen.nodes:
+                j = frozen.index_of(target)
+                assert frozen.reachable(i, j) == Node.nexts.reachable(start, target)
+                path = frozen.shortest_path(i, j)
+                if target in tree:
+                    assert path_cost(frozen.to_nodes(path)) == frozen.path_cost(path) == tree.cost(target)
+                    assert len(unweighted.shortest_path(i, j)) == len(Node.nexts.shortest_path(start, target))
+                else:
+                    assert path is unweighted.shortest_path(i, j) is None
+
+        reverse = frozen.reverse()
+        assert reverse.reverse() is frozen
+        for node in frozen.nodes:
+            assert set(reverse.to_nodes(reverse.neighbours(frozen.index_of(node)))) == set(node.prevs)
+
+    def test_frozen_analytics(self):
+        class Node(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+        nodes = [Node() for _ in range(60)]
+        for node1 in nodes:
+            for node2 in nodes:
+                if flipcoin(0.015):
+                    node1.nexts.include(node2)
+        frozen = FrozenGraph(nodes, Iterator('nexts').iter_object)
+
+        levels = frozen.levels(0, use_numpy=False)
+        for i, level in enumerate(levels):
+            path = frozen.shortest_path(0, i)
+            assert level == (-1 if path is None else len(path) - 1)
+        multi_levels = frozen.levels([0, 1, 2], use_numpy=False)
+        assert multi_levels == [min((l for l in ls if l >= 0), default=-1)
+                                for ls in zip(*(frozen.levels(i, use_numpy=False) for i in (0, 1, 2)))]
+
+        components = frozen.components(use_numpy=False)
+        for i in range(len(nodes)):
+            assert components[i] == min(frozen.gather(i))
+
+        ranks = frozen.pagerank(use_numpy=False)
+        assert abs(sum(ranks) - 1) < 1e-9
+        assert all(rank > 0 for rank in ranks)
+
+        if numpy is not None:
+            assert frozen.levels(0, use_numpy=True) == levels
+            assert frozen.levels([0, 1, 2], use_numpy=True) == multi_levels
+            assert frozen.components(use_numpy=True) == components
+            assert all(abs(r1 - r2) < 1e-9 for r1, r2 in zip(frozen.pagerank(use_numpy=True), ranks))
+
+    def test_number_nodes(self):
+        class Numbered(object):
+            nexts = Many('prevs', number_nodes=True)
+            prevs = Many('nexts')
+
+            def __init__(self, num):
+                self.num = num
+
+        class Plain(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+            def __init__(self, num):
+                self.num = num
+
+        weights = {}
+
+        def weight(node1, node2):
+            return weights.setdefault((node1.num, node2.num), random.randint(1, 20))
+
+        def path_cost(path):
+            return sum(weight(o1, o2) for o1, o2 in chained(path))
+
+        numbered = [Numbered(i) for i in range(40)]
+        plain = [Plain(i) for i in range(40)]
+        for i in range(40):
+            for j in range(40):
+                if flipcoin(0.05):
+                    numbered[i].nexts.include(numbered[j])
+                    plain[i].nexts.include(plain[j])
+        key = Numbered.nexts._numbers.key
+        assert Numbered.prevs._registry(numbered[0]) is Numbered.nexts._numbers
+        assert len({n.__dict__.get(key) for n in numbered if len(n.nexts) or len(n.prevs)}) == \
+               sum(1 for n in numbered if len(n.nexts) or len(n.prevs))
+
+        def nums(nodes):
+            return None if nodes is None else [n.num for n in nodes]
+
+        for i in range(10):
+            for breadth_first in (False, True):
+                assert nums(Numbered.nexts.iterate(numbered[i], breadth_first=breadth_first)) == \
+                       nums(Plain.nexts.iterate(plain[i], breadth_first=breadth_first))
+            assert set(nums(Numbered.nexts.gather(numbered[i]))) == set(nums(Plain.nexts.gather(plain[i])))
+            for j in range(40):
+                assert Numbered.nexts.reachable(numbered[i], numbered[j]) == Plain.nexts.reachable(plain[i], plain[j])
+                path = Numbered.nexts.shortest_path(numbered[i], numbered[j], get_cost=weight)
+                plain_path = Plain.nexts.shortest_path(plain[i], plain[j], get_cost=weight)
+                assert (path is None) == (plain_path is None)
+                if path is not None:
+                    assert path[0] is numbered[i] and path[-1] is numbered[j]
+                    assert path_cost(path) == path_cost(plain_path)
+                    assert path_cost(Numbered.nexts.shortest_path(numbered[i], numbered[j], get_cost=weight,
+                                                                  heuristic=lambda n, t: 0)) == path_cost(path)
+
+        single = Numbered(40)  # never linked, so not numbered yet
+        assert list(Numbered.nexts.iterate(single)) == [single]
+        assert Numbered.nexts.shortest_path(single, numbered[0]) is None
+
+    def test_number_copied_nodes(self):
+        class Numbered(object):
+            nexts = Many('prevs', number_nodes=True)
+            prevs = Many('nexts')
+
+        nodes = [Numbered() for _ in range(7)]
+        for node1, node2 in chained(nodes):
+            node1.nexts.include(node2)
+        for copies in (deepcopy(nodes), deepcopy(nodes)):
+            copies[-1].nexts.include(nodes[0])  # copies must not share numbers with the originals
+            assert len(Numbered.nexts.gather(copies[0])) == 14
+            assert len(list(Numbered.nexts.iterate(copies[0]))) == 14
+            assert Numbered.nexts.reachable(copies[0], nodes[-1])
+            assert len(Numbered.nexts.shortest_path(copies[0], nodes[-1])) == 14
+            copies[-1].nexts.exclude(nodes[0])
+
+    def test_specific_iter_object(self):
+        class OneNode(object):
+            nexts = One()
+
+        class ManyNode(object):
+            nexts = Many()
+
+        class MapNode(object):
+            nexts = ManyMap(key='name')
+
+            def __init__(self, name):
+                self.name = name
+
+        class PlainNode(object):
+            def __init__(self, *nexts):
+                self.name = 'plain'
+                self.nexts = list(nexts)
+
+        plain = PlainNode()
+        mapped = MapNode('map')
+        many = ManyNode()
+        one = OneNode()
+        uninitialized = ManyNode()
+        one.nexts = many
+        many.nexts = [mapped, one, plain, uninitialized]
+        mapped.nexts.include(PlainNode(one))
+
+        generic = Iterator('nexts').iter_object
+        for linker in (OneNode.nexts, ManyNode.nexts, MapNode.nexts):
+            for node in Iterator('nexts').iterate(one):
+                assert list(linker._iter_object(node)) == list(generic(node))
+            assert list(linker.iterate(one)) == list(Iterator('nexts').iterate(one))
+        fresh = ManyNode()
+        assert list(ManyNode.nexts._iter_object(fresh)) == []
+        assert 'nexts' not in fresh.__dict__  # not initialized by just iterating
+
+    def test_limits(self):
+        class Node(object):
+            nexts = Many('prevs')
+            prevs = Many('nexts')
+
+            def __init__(self, num):
+                self.num = num
+
+        nodes = [Node(i) for i in range(60)]
+        for node1 in nodes:
+            for node2 in nodes:
+                if flipcoin(0.04):
+                    node1.nexts.include(node2)
+        start = nodes[0]
+        levels = FrozenGraph(nodes, Node.nexts._iter_object).levels(0)
+
+        for max_depth in range(5):
+            within = {n for n, level in zip(nodes, levels) if 0 <= level <= max_depth}
+            for breadth_first in (False, True):
+                iterated = list(Node.nexts.iterate(start, breadth_first=breadth_first, max_depth=max_depth))
+                assert len(iterated) == len(set(map(id, iterated))) and set(iterated) == within
+            assert set(Node.nexts.find(start, lambda n: n.num % 2, max_depth=max_depth)) == \
+                   {n for n in within if n.num % 2}
+            assert set(Find('nexts', lambda n: n.num % 2)(start, max_depth=max_depth)) == \
+                   {n for n in within if n.num % 2}
+            for target in nodes:
+                reachable = Node.nexts.reachable(start, target, max_depth=max_depth)
+                if target is not start:
+                    assert reachable == (target in within and target is not start)
+            endpoints = Node.nexts.endpoints(start, max_depth=max_depth)
+            assert set(endpoints) == {n for n in within if not len(n.nexts)}
+            assert start in Node.nexts.gather(start, max_depth=max_depth)
+
+        assert len(list(Node.nexts.iterate(start, max_nodes=7))) == min(7, len(list(Node.nexts.iterate(start))))
+        assert Node.nexts.gather(start, max_nodes=1) == [start]
+
+        def prune(node):
+            return node.num % 3 == 0
+
+        for breadth_first in (False, True):
+            pruned = list(Node.nexts.iterate(start, breadth_first=breadth_first, prune=prune))
+            assert pruned == [start]  # start itself is pruned
+        expanded = [n for n in Node.nexts.iterate(nodes[1], prune=prune)]
+        for node in expanded:
+            if not prune(node):
+                assert all(next_node in expanded for next_node in node.nexts)
+        assert not Node.nexts.reachable(start, nodes[1], prune=prune)  # start itself is pruned
+        for target in nodes:
+            assert Node.nexts.reachable(nodes[1], target, prune=prune) == \
+                   any(target in node.nexts for node in expanded if not prune(node))
+
+    def test_run_visitors(self):
+        class Node(object):
+            nexts = Many()
+
+            def __init__(self, num):
+                self.num = num
+
+        nodes = [Node(i) for i in range(50)]
+        for node1 in nodes:
+            for node2 in nodes:
+                if flipcoin(0.05):
+                    node1.nexts.include(node2)
+        start = nodes[0]
+        visited = []
+
+        def counting(node):
+            visited.append(node)
+            return node.num % 5 == 0
+
+        find, endpoints, count = Find('nexts', lambda n: n.num % 2), GetEndpoints('nexts'), Count('nexts')
+        results = Node.nexts.run(start, find, endpoints, count, Count('nexts', counting), breadth_first=True)
+        assert results == [find(start, breadth_first=True), endpoints(start, breadth_first=True),
+                           len(list(Node.nexts.iterate(start))), len([n for n in visited if n.num % 5 == 0])]
+        assert len(visited) == results[2]  # one pass
+
+        del visited[:]
+        find_one = FindOne('nexts', lambda n: n.num > 0)
+        has = Has('nexts', counting)
+        found, has_five = Node.nexts.run(start, find_one, has)
+        assert found is find_one(start) and has_five
+        assert len(visited) == 1  # start passes 'counting': both visitors are done after the first node
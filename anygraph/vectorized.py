@@ -0,0 +1,92 @@
+"""
+Vectorized (NumPy) algorithms on the CSR arrays of a FrozenGraph. NumPy is optional: if it cannot be imported,
+'numpy' is None and FrozenGraph falls back to its pure Python implementations.
+"""
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def as_numpy(buffer):
+    """ numpy view (no copy) of an array.array of integers """
+    return numpy.frombuffer(buffer, dtype=f'i{buffer.itemsize}') if len(buffer) else numpy.zeros(0, dtype=numpy.int64)
+
+
+def _sources(offsets):
+    """ the source node of every edge, aligned with 'indices' """
+    count = len(offsets) - 1
+    return numpy.repeat(numpy.arange(count), numpy.diff(offsets))
+
+
+def levels(offsets, indices, sources):
+    """
+    Level-synchronous (multi-source) breadth first search: all nodes of the frontier are expanded at once.
+    :return: array with the number of edges from the nearest source for every node, -1 for nodes not reached
+    """
+    count = len(offsets) - 1
+    degrees = numpy.diff(offsets)
+    result = numpy.full(count, -1, dtype=numpy.int64)
+    frontier = numpy.unique(numpy.asarray(sources, dtype=numpy.int64))
+    result[frontier] = 0
+    level = 0
+    while frontier.size:
+        counts = degrees[frontier]
+        total = counts.sum()
+        if not total:
+            break
+        # positions in 'indices' of the edges of all frontier nodes
+        positions = numpy.repeat(offsets[frontier] - (numpy.cumsum(counts) - counts), counts) + numpy.arange(total)
+        next_nodes = indices[positions]
+        frontier = numpy.unique(next_nodes[result[next_nodes] < 0])
+        level += 1
+        result[frontier] = level
+    return result
+
+
+def components(offsets, indices):
+    """
+    Weakly connected components, by propagating the lowest node number over the edges (in both directions) and
+    pointer jumping, until nothing changes.
+    :return: array with for every node the lowest node number in its component
+    """
+    count = len(offsets) - 1
+    sources, targets = _sources(offsets), indices
+    labels = numpy.arange(count)
+    while True:
+        old_labels = labels
+        labels = labels.copy()
+        numpy.minimum.at(labels, sources, old_labels[targets])
+        numpy.minimum.at(labels, targets, old_labels[sources])
+        while True:
+            jumped = labels[labels]
+            if numpy.array_equal(jumped, labels):
+                break
+            labels = jumped
+        if numpy.array_equal(labels, old_labels):
+            return labels
+
+
+def pagerank(offsets, indices, damping=0.85, tolerance=1e-10, max_iterations=100):
+    """
+    PageRank by power iteration; the rank of nodes without outgoing edges is spread over all nodes.
+    :return: array of ranks, summing to 1
+    """
+    count = len(offsets) - 1
+    if not count:
+        return numpy.zeros(0)
+    sources, targets = _sources(offsets), indices
+    degrees = numpy.diff(offsets)
+    dangling = degrees == 0
+    inverse_degrees = numpy.zeros(count)
+    inverse_degrees[~dangling] = 1.0 / degrees[~dangling]
+    ranks = numpy.full(count, 1.0 / count)
+    for _ in range(max_iterations):
+        shares = ranks * inverse_degrees
+        new_ranks = numpy.bincount(targets, weights=shares[sources], minlength=count)
+        new_ranks = damping * (new_ranks + ranks[dangling].sum() / count) + (1 - damping) / count
+        converged = numpy.abs(new_ranks - ranks).sum() < tolerance
+        ranks = new_ranks
+        if converged:
+            break
+    return ranks
@@ -1,5 +1,7 @@
-from collections import deque, Mapping
+from collections import deque
+from collections.abc import Mapping
 from heapq import heappop, heappush
+from itertools import islice
 from operator import attrgetter
 
 
@@ -10,9 +12,11 @@ class Found(Exception):
 
 class BaseIterator(object):
 
-    def __init__(self, attr_name, raise_on_missing=False):
+    def __init__(self, attr_name, raise_on_missing=False, iter_object=None):
         self.getter = attrgetter(attr_name)
         self.raise_on_missing = raise_on_missing
+        if iter_object is not None:
+            self.iter_object = iter_object  # e.g. a faster version, specific for the graph
 
     def iter_object(self, obj):
         try:
@@ -39,19 +43,34 @@ class BaseIterator(object):
             if obj is None:
                 break
 
-    def iterate(self, obj, cyclic=False, breadth_first=False):
+    def iterate(self, obj, cyclic=False, breadth_first=False, max_depth=None, prune=None, max_nodes=None):
+        """
+        :param max_depth: optional max number of edges from obj; nodes further away are not visited
+        :param prune(node): optional function; if it returns True, the next nodes of node are not visited (through node)
+        :param max_nodes: optional max number of nodes to visit
+        """
         registry = None if cyclic else set()
-        if breadth_first:
-            yield from self._breadth_first(obj, reg=registry)
+        if max_depth is None and prune is None:
+            if breadth_first:
+                objs = self._breadth_first(obj, reg=registry)
+            else:
+                objs = self._depth_first(obj, reg=registry)
+        elif breadth_first:
+            objs = self._limited_breadth_first(obj, registry, max_depth, prune)
         else:
-            yield from self._depth_first(obj, reg=registry)
+            objs = self._limited_depth_first(obj, registry, max_depth, prune)
+        if max_nodes is not None:
+            objs = islice(objs, max_nodes)
+        yield from objs
 
     __call__ = iterate
 
-    def shortest_path(self, start_obj, target_obj, get_cost=None, heuristic=None):
+    def shortest_path(self, start_obj, target_obj, get_cost=None, heuristic=None, reverse_name=None):
         if get_cost is None:
             def get_cost(o1, o2):
                 return 0 if o1 is o2 else 1
+        if reverse_name:
+            return self._bidirectional(start_obj, target_obj, get_cost, heuristic, Iterator(reverse_name))
         if heuristic:
             return self._astar(start_obj, target_obj, get_cost, heuristic)
         else:
@@ -63,22 +82,107 @@ class BaseIterator(object):
                 return 0 if o1 is o2 else 1
         return self._multi_dijkstra(start_obj, target_objs, get_cost, allow_partial)
 
+    def shortest_path_tree(self, start_obj, get_cost=None, max_cost=None):
+        if get_cost is None:
+            def get_cost(o1, o2):
+                return 0 if o1 is o2 else 1
+        done, path, cost = self._dijkstra_search(start_obj, get_cost, max_cost=max_cost)
+        return ShortestPathTree(self, start_obj, done, path, cost)
+
     def _depth_first(self, obj, reg):
-        """ does not use recursion to prevent running out of the callstack """
+        """
+        does not use recursion to prevent running out of the callstack; keeps a stack of iterators over next nodes, so
+        next nodes are only retrieved when needed (stopping early is cheap). Because of this, links must not be changed
+        while iterating (collect the nodes first, e.g. with list()).
+        """
+        if reg is not None:
+            reg.add(id(obj))
+        yield obj
+        stack = [self.iter_object(obj)]
+        while stack:
+            for next_obj in stack[-1]:
+                if reg is None or id(next_obj) not in reg:
+                    if reg is not None:
+                        reg.add(id(next_obj))
+                    yield next_obj
+                    stack.append(self.iter_object(next_obj))
+                    break
+            else:
+                stack.pop()
+
+    def _limited_depth_first(self, obj, reg, max_depth, prune):
+        """
+        as _depth_first, but does not go deeper than max_depth and not past nodes for which prune(node) is True; with
+        max_depth, nodes first found deeper than needed are searched again (not visited again) when found less deep.
+        """
+        depths = None if reg is None else {id(obj): 0}
+        yield obj
+        if max_depth == 0 or (prune is not None and prune(obj)):
+            return
+        stack = [self.iter_object(obj)]
+        while stack:
+            depth = len(stack)  # of the next nodes
+            for next_obj in stack[-1]:
+                if depths is not None:
+                    known_depth = depths.get(id(next_obj))
+                    if known_depth is not None and (max_depth is None or known_depth <= depth):
+                        continue
+                    depths[id(next_obj)] = depth
+                    if known_depth is None:
+                        yield next_obj
+                else:
+                    yield next_obj
+                if (max_depth is None or depth < max_depth) and not (prune is not None and prune(next_obj)):
+                    stack.append(self.iter_object(next_obj))
+                    break
+            else:
+                stack.pop()
+
+    def _limited_breadth_first(self, obj, reg, max_depth, prune):
+        """ as _breadth_first, but does not go deeper than max_depth and not past nodes for which prune(node) is True """
         if reg is not None:
             reg.add(id(obj))
-        stack = [obj]
-        while len(stack):
-            obj = stack.pop()
+        queue = deque([(obj, 0)])
+        while len(queue):
+            obj, depth = queue.popleft()
             yield obj
-            objs = list(self.iter_object(obj))
-            if reg is None:
-                stack.extend(reversed(objs))
+            if (max_depth is not None and depth >= max_depth) or (prune is not None and prune(obj)):
+                continue
+            for next_obj in self.iter_object(obj):
+                if reg is None:
+                    queue.append((next_obj, depth + 1))
+                elif id(next_obj) not in reg:
+                    reg.add(id(next_obj))
+                    queue.append((next_obj, depth + 1))
+
+    def depth_first_events(self, obj):
+        """
+        Lazy depth first search, yielding tuples (event, node, depth, parent), with events:
+         - 'discover': node is visited for the first time,
+         - 'finish': all nodes reachable from node have been visited (post-order),
+         - 'back': edge from parent to node, which is still being searched (the edge closes a cycle),
+         - 'cross': edge from parent to node, which is already finished.
+        For 'back' and 'cross' depth is the depth parent + 1.
+        Links must not be changed while iterating (see _depth_first).
+        """
+        on_stack, finished = 1, 2
+        state = {id(obj): on_stack}
+        yield 'discover', obj, 0, None
+        stack = [(obj, self.iter_object(obj))]
+        while stack:
+            parent, next_objs = stack[-1]
+            for next_obj in next_objs:
+                next_state = state.get(id(next_obj))
+                if next_state is None:
+                    state[id(next_obj)] = on_stack
+                    yield 'discover', next_obj, len(stack), parent
+                    stack.append((next_obj, self.iter_object(next_obj)))
+                    break
+                yield ('back' if next_state == on_stack else 'cross'), next_obj, len(stack), parent
             else:
-                for next_obj in reversed(objs):
-                    if id(next_obj) not in reg:
-                        reg.add(id(next_obj))
-                        stack.append(next_obj)
+                stack.pop()
+                state[id(parent)] = finished
+                yield 'finish', parent, len(stack), stack[-1][0] if stack else None
 
     def _breadth_first(self, obj, reg):
         if reg is not None:
@@ -95,42 +199,55 @@ class BaseIterator(object):
                         reg.add(id(next_obj))
                         queue.append(next_obj)
 
-    def _base_dijkstra(self, start_obj, target_objs, get_cost):
+    def _dijkstra_search(self, start_obj, get_cost, target_ids=(), max_cost=None):
         """
-            Pretty standard implementation of Dijkstra, id() is used because not all objects are hashable and
-            the implementation uses a set and dicts. It uses multiple targets, and is used by the single target
-            version.
+            Pretty standard implementation of Dijkstra with a binary heap, id() is used because not all objects are
+            hashable and the implementation uses a set and dicts. Outdated heap entries are skipped when popped (lazy
+            deletion), so each node is settled once. The search stops when all targets are settled (if any) or when
+            the cost exceeds max_cost (if given).
+            :return: dicts 'done' (settled nodes by id, in settled order), 'path' and 'cost' (predecessor id and
+                cost by id; for unsettled nodes these are tentative).
         """
-        shortest = []
-        targets = {id(t) for t in target_objs}
+        remaining = set(target_ids)
         path = {id(start_obj): None}
         cost = {id(start_obj): 0}
-        queue = deque([start_obj])
+        heap = [(0, id(start_obj), start_obj)]
         done = {}  # a dict because it is also used to translate back from ids to objects in _create_path
-        while len(queue):
-            obj = queue.popleft()
-            obj_id = id(obj)
+        while heap:
+            obj_cost, obj_id, obj = heappop(heap)
+            if obj_id in done:
+                continue
+            if max_cost is not None and obj_cost > max_cost:
+                break
             done[obj_id] = obj
 
-            if obj_id in targets:
-                targets.remove(obj_id)
-                shortest.append(self._create_path(obj, path, id_map=done))
-                if not len(targets):  # all targets have paths
-                    return shortest
+            if remaining:
+                remaining.discard(obj_id)
+                if not remaining:  # all targets are settled
+                    break
 
             for next_obj in self.iter_object(obj):
                 next_id = id(next_obj)
                 if next_id in done:
                     continue
 
-                next_cost = cost[obj_id] + get_cost(obj, next_obj)
+                next_cost = obj_cost + get_cost(obj, next_obj)
                 if next_cost >= cost.get(next_id, float('inf')):
                     continue
 
                 path[next_id] = obj_id
                 cost[next_id] = next_cost
-                queue.append(next_obj)
-        return shortest  # there are less paths than targets
+                heappush(heap, (next_cost, next_id, next_obj))  # next_id because obj's do not always have '<' operator
+        return done, path, cost
+
+    def _base_dijkstra(self, start_obj, target_objs, get_cost):
+        """
+            Uses the search above with multiple targets, and is used by the single target version. Paths are returned in
+            the order the targets are settled.
+        """
+        targets = {id(t) for t in target_objs}
+        done, path, _ = self._dijkstra_search(start_obj, get_cost, target_ids=targets)
+        return [self._create_path(obj, path, id_map=done) for obj_id, obj in done.items() if obj_id in targets]
 
     def _dijkstra(self, start_obj, target_obj, get_cost):
         """
@@ -163,6 +280,8 @@ class BaseIterator(object):
         done = {}  # a dict because it is also used to translate back from ids to objects in _create_path
         while heap:
             _, obj_id, obj = heappop(heap)
+            if obj_id in done:
+                continue
             done[obj_id] = obj
 
             if obj is target_obj:
@@ -185,6 +304,69 @@ class BaseIterator(object):
                          (next_cost + from_cost, next_id, next_obj))  # next_id because obj's do not always have '<' operator
         return None  # there is no path
 
+    def _bidirectional(self, start_obj, target_obj, get_cost, heuristic, reverse):
+        """
+            Bidirectional Dijkstra, searching forward from start_obj and backward (following the 'reverse' iterator)
+            from target_obj at the same time, expanding the side with the smallest heap. With a heuristic, A* is used
+            with the average of the forward and backward estimates as potential, which keeps both searches consistent
+            (this assumes a symmetric heuristic). The search stops when the smallest keys in both heaps add up to the
+            cost of the best path found so far.
+        """
+        if start_obj is target_obj:
+            return [start_obj]
+
+        if heuristic:
+            def potential(obj):
+                return (heuristic(obj, target_obj) - heuristic(obj, start_obj)) / 2
+        else:
+            def potential(obj):
+                return 0
+
+        iter_objects = (self.iter_object, reverse.iter_object)
+        signs = (1, -1)  # forward potential is subtracted for the backward search
+        costs = ({id(start_obj): 0}, {id(target_obj): 0})
+        paths = ({id(start_obj): None}, {id(target_obj): None})
+        dones = (set(), set())
+        heaps = ([(potential(start_obj), id(start_obj), start_obj)],
+                 [(-potential(target_obj), id(target_obj), target_obj)])
+        id_map = {id(start_obj): start_obj, id(target_obj): target_obj}  # to translate back from ids to objects
+
+        best_cost, meet_obj = float('inf'), None
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best_cost:
+                break
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            _, obj_id, obj = heappop(heaps[side])
+            if obj_id in dones[side]:
+                continue
+            dones[side].add(obj_id)
+
+            cost, other_cost, path, done, sign = costs[side], costs[1 - side], paths[side], dones[side], signs[side]
+            for next_obj in iter_objects[side](obj):
+                next_id = id(next_obj)
+                if next_id in done:
+                    continue
+
+                if side == 0:
+                    next_cost = cost[obj_id] + get_cost(obj, next_obj)
+                else:
+                    next_cost = cost[obj_id] + get_cost(next_obj, obj)
+
+                if next_cost < cost.get(next_id, float('inf')):
+                    path[next_id] = obj_id
+                    cost[next_id] = next_cost
+                    id_map[next_id] = next_obj
+                    heappush(heaps[side], (next_cost + sign * potential(next_obj), next_id, next_obj))
+
+                    if next_id in other_cost and next_cost + other_cost[next_id] < best_cost:
+                        best_cost, meet_obj = next_cost + other_cost[next_id], next_obj
+
+        if meet_obj is None:
+            return None  # there is no path
+        forward_path = self._create_path(meet_obj, paths[0], id_map=id_map)
+        backward_path = self._create_path(meet_obj, paths[1], id_map=id_map)
+        return forward_path + backward_path[-2::-1]
+
     def _create_path(self, obj, id_path, id_map):
         rev_path = []
         obj_id = id(obj)
@@ -194,15 +376,168 @@ class BaseIterator(object):
         return list(reversed(rev_path))
 
 
+class ShortestPathTree(object):
+    """
+    Result of a single source shortest path search: the cost of and predecessor on the shortest path to each settled
+    node. Looking up costs takes constant time; paths are only reconstructed when asked for.
+    """
+
+    def __init__(self, iterator, start_obj, done, path, cost):
+        self.iterator = iterator
+        self.start_obj = start_obj
+        self._done = done
+        self._path = path
+        self._cost = cost
+
+    def __len__(self):
+        return len(self._done)
+
+    def __contains__(self, obj):
+        return id(obj) in self._done
+
+    def __iter__(self):
+        """ iterate over the settled nodes, from low to high cost """
+        return iter(self._done.values())
+
+    def cost(self, obj):
+        """ return the cost of the shortest path to obj, or None if obj was not reached """
+        obj_id = id(obj)
+        if obj_id in self._done:
+            return self._cost[obj_id]
+        return None
+
+    def predecessor(self, obj):
+        """ return the node before obj on the shortest path to obj (None for the start node or if not reached) """
+        obj_id = id(obj)
+        if obj_id in self._done and self._path[obj_id] is not None:
+            return self._done[self._path[obj_id]]
+        return None
+
+    def path(self, obj):
+        """ return the shortest path to obj as a list of nodes, or None if obj was not reached """
+        if id(obj) not in self._done:
+            return None
+        return self.iterator._create_path(obj, self._path, id_map=self._done)
+
+
 class Iterator(BaseIterator):
     pass
 
 
+class NumberedIterator(Iterator):
+    """
+    Iterator using the node numbers of a NodeRegistry: visited sets are bytearrays and costs and predecessors are lists
+    indexed by node number, instead of sets and dicts keyed by id(). For large graphs this takes much less memory.
+    """
+
+    def __init__(self, attr_name, registry, raise_on_missing=False, iter_object=None):
+        super().__init__(attr_name, raise_on_missing, iter_object)
+        self.registry = registry
+
+    def _depth_first(self, obj, reg):
+        if reg is None:
+            yield from super()._depth_first(obj, reg)
+            return
+        number = self.registry.number
+        seen = bytearray(len(self.registry))
+        start = number(obj)
+        if start >= len(seen):
+            seen.extend(bytes(start + 1 - len(seen)))
+        seen[start] = 1
+        yield obj
+        stack = [self.iter_object(obj)]
+        while stack:
+            for next_obj in stack[-1]:
+                next_number = number(next_obj)
+                if next_number >= len(seen):  # numbered during iteration
+                    seen.extend(bytes(next_number + 1 - len(seen)))
+                if not seen[next_number]:
+                    seen[next_number] = 1
+                    yield next_obj
+                    stack.append(self.iter_object(next_obj))
+                    break
+            else:
+                stack.pop()
+
+    def _breadth_first(self, obj, reg):
+        if reg is None:
+            yield from super()._breadth_first(obj, reg)
+            return
+        number = self.registry.number
+        seen = bytearray(len(self.registry))
+        start = number(obj)
+        if start >= len(seen):
+            seen.extend(bytes(start + 1 - len(seen)))
+        seen[start] = 1
+        queue = deque([obj])
+        while len(queue):
+            obj = queue.popleft()
+            yield obj
+            for next_obj in self.iter_object(obj):
+                next_number = number(next_obj)
+                if next_number >= len(seen):
+                    seen.extend(bytes(next_number + 1 - len(seen)))
+                if not seen[next_number]:
+                    seen[next_number] = 1
+                    queue.append(next_obj)
+
+    def _dijkstra(self, start_obj, target_obj, get_cost):
+        return self._numbered_search(start_obj, target_obj, get_cost, heuristic=None)
+
+    def _astar(self, start_obj, target_obj, get_cost, heuristic):
+        return self._numbered_search(start_obj, target_obj, get_cost, heuristic=heuristic)
+
+    def _numbered_search(self, start_obj, target_obj, get_cost, heuristic):
+        """ Dijkstra, or A* with a heuristic, with lists indexed by node number """
+        inf = float('inf')
+        number = self.registry.number
+        size = len(self.registry)
+        objs, preds, costs, done = [None] * size, [-1] * size, [inf] * size, bytearray(size)
+
+        def grow(n):
+            extra = n + 1 - len(done)
+            objs.extend([None] * extra)
+            preds.extend([-1] * extra)
+            costs.extend([inf] * extra)
+            done.extend(bytes(extra))
+
+        start, target = number(start_obj), number(target_obj)
+        if max(start, target) >= len(done):
+            grow(max(start, target))
+        objs[start], costs[start] = start_obj, 0
+        heap = [(0, start)]
+        while heap:
+            _, i = heappop(heap)
+            if done[i]:
+                continue
+            done[i] = 1
+            if i == target:
+                path = [i]
+                while path[-1] != start:
+                    path.append(preds[path[-1]])
+                return [objs[j] for j in reversed(path)]
+
+            obj, cost = objs[i], costs[i]
+            for next_obj in self.iter_object(obj):
+                j = number(next_obj)
+                if j >= len(done):
+                    grow(j)
+                elif done[j]:
+                    continue
+                next_cost = cost + get_cost(obj, next_obj)
+                if next_cost >= costs[j]:
+                    continue
+                objs[j], preds[j], costs[j] = next_obj, i, next_cost
+                heappush(heap, (next_cost + heuristic(next_obj, target_obj) if heuristic else next_cost, j))
+        return None  # there is no path
+
+
 class Visitor(BaseIterator):
 
-    def __call__(self, obj, on_visit, cyclic=False, breadth_first=False):
+    def __call__(self, obj, on_visit, cyclic=False, breadth_first=False, **limits):
+        """ limits: max_depth, prune and max_nodes, see 'iterate' """
         try:
-            for obj in self.iterate(obj, cyclic, breadth_first):
+            for obj in self.iterate(obj, cyclic, breadth_first, **limits):
                 on_visit(obj)
         except StopIteration:
             pass
@@ -218,12 +553,12 @@ class BaseVisitor(BaseIterator):
         """ override to create argument for visit function to store results """
         return None
 
-    def __call__(self, obj, cyclic=False, breadth_first=False):
-        """ run through the graph and apply 'self.visit' """
+    def __call__(self, obj, cyclic=False, breadth_first=False, **limits):
+        """ run through the graph and apply 'self.visit'; limits: max_depth, prune and max_nodes, see 'iterate' """
         visit = self.visit
         store = self.get_store()
         try:
-            for obj in self.iterate(obj, cyclic, breadth_first):
+            for obj in self.iterate(obj, cyclic, breadth_first, **limits):
                 result = visit(obj, store)
                 if result is not None:
                     return self.post_process(result)
@@ -247,15 +582,22 @@ class BaseFinder(object):
     """ adds filter to instance to be used in search like sub-classes """
 
     def __init__(self, prop_name, filter):
-        super().__init__(prop_name, cyclic=False)
+        super().__init__(prop_name)
         self.filter = filter
 
 
-class Has(BaseFinder, BaseIterator):
+class Has(BaseFinder, BaseVisitor):
     """ return whether there are any nodes that pass .filter """
 
-    def __call__(self, obj, breadth_first=False):
-        return any(map(self.filter, self.iterate(obj, breadth_first=breadth_first)))
+    def __call__(self, obj, breadth_first=False, **limits):
+        return any(map(self.filter, self.iterate(obj, breadth_first=breadth_first, **limits)))
+
+    def visit(self, obj, store):
+        if self.filter(obj):
+            return True
+
+    def post_process(self, store):
+        return bool(store)
 
 
 class Find(BaseFinder, BaseVisitor):
@@ -286,3 +628,59 @@ class GetEndpoints(BaseVisitor):
     def visit(self, obj, store):
         if not list(self.iter_object(obj)):
             store.append(obj)
+
+
+class Count(BaseVisitor):
+    """ count the nodes (that pass the optional filter) """
+
+    def __init__(self, prop_name, filter=None):
+        super().__init__(prop_name)
+        self.filter = filter
+
+    def get_store(self):
+        return [0]
+
+    def visit(self, obj, store):
+        if self.filter is None or self.filter(obj):
+            store[0] += 1
+
+    def post_process(self, store):
+        return store[0]
+
+
+class MultiVisitor(BaseIterator):
+    """
+    Runs a number of visitors (instances of BaseVisitor subclasses) in a single pass through the graph: every node is
+    passed to every visitor that is not done yet. A visitor is done when it returns a result or raises StopIteration;
+    the pass stops when all visitors are done.
+    """
+
+    def __init__(self, attr_name, visitors, raise_on_missing=False, iter_object=None):
+        super().__init__(attr_name, raise_on_missing, iter_object)
+        self.visitors = list(visitors)
+
+    def __call__(self, obj, cyclic=False, breadth_first=False, **limits):
+        """ returns a list with the result of each visitor (as the visitor would return it when run on its own) """
+        visitors = self.visitors
+        stores = [visitor.get_store() for visitor in visitors]
+        results = [None] * len(visitors)
+        active = list(range(len(visitors)))
+        for obj in self.iterate(obj, cyclic, breadth_first, **limits):
+            done = []
+            for i in active:
+                try:
+                    result = visitors[i].visit(obj, stores[i])
+                except StopIteration:
+                    result = stores[i]
+                else:
+                    if result is None:
+                        continue
+                results[i] = visitors[i].post_process(result)
+                done.append(i)
+            if done:
+                active = [i for i in active if i not in done]
+                if not active:
+                    return results
+        for i in active:
+            results[i] = visitors[i].post_process(stores[i])
+        return results